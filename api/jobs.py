@@ -0,0 +1,93 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job manager cannot accept more work."""
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.frames_processed = 0
+        self.frames_total = None
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ("completed", "failed")
+
+    def report_progress(self, frames_processed: int, frames_total: int = None):
+        self.frames_processed = frames_processed
+        if frames_total is not None:
+            self.frames_total = frames_total
+
+class JobManager:
+    """Bounded local worker pool for long-running video jobs.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    wait; ``submit`` raises ``JobQueueFull`` beyond that. Finished jobs are
+    kept for status queries, oldest evicted first past ``keep_finished``.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, keep_finished: int = 1000):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="iris-job")
+        self._jobs = OrderedDict()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        """Queue ``fn(job, *args, **kwargs)``; its return value becomes ``job.result``."""
+        with self._lock:
+            if self._active >= self.max_workers + self.max_queue:
+                raise JobQueueFull(
+                    f"Job queue is full ({self._active} jobs queued or running)"
+                )
+            job = Job(kind)
+            self._jobs[job.id] = job
+            self._active += 1
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def list(self):
+        return list(self._jobs.values())
+
+    @property
+    def active(self):
+        return self._active
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "completed"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                self._active -= 1
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
@@ -2,19 +2,27 @@ import os
 import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import Depends, FastAPI, File, Form, HTTPException, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.jobs import JobManager, JobQueueFull
 from config.config_loader import load_config
+from core.ann_index import IVFIndex
+from core.metrics import METRICS
+from core.motion_sampler import MotionSampler
 from core.pipeline import IrisPipeline
-from db.db_utils import get_session, init_db
-from db.models import AttendanceEvent, IrisTemplate, Person
+from db import queries
+from db.db_utils import get_session, init_db, session_scope
+from db.models import IrisTemplate
 from services.attendance_service import AttendanceService
 from services.enrollment_service import EnrollmentService
+from services.template_gallery import get_shared_gallery
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 app = FastAPI(title="Iris Attendance API", version="0.1.0")
 app.add_middleware(
@@ -23,14 +31,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # browsers hide non-safelisted response headers from cross-origin callers
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 CFG = load_config()
-init_db(CFG["db_url"])
+init_db(CFG["db_url"], CFG.get("db"))
 SessionFactory = get_session(CFG)
 PIPELINE = IrisPipeline(CFG)
+GALLERY = get_shared_gallery(CFG["db_url"], index=IVFIndex.from_config(CFG.get("match", {}).get("ann")))
+with session_scope(CFG) as _session:
+    GALLERY.load_snapshot(
+        CFG.get("gallery", {}).get("snapshot_dir"),
+        _session,
+        CFG.get("encoder", {}).get("model_version"),
+        PIPELINE.encoder.embedding_dim,
+    )
 VIDEO_CFG = CFG.get("video", {})
+SAMPLER = MotionSampler.from_config(VIDEO_CFG.get("motion"))
 MATCH_CFG = CFG.get("match", {})
+ENROLL_CFG = CFG.get("enrollment", {})
+ATTENDANCE_CFG = CFG.get("attendance", {})
+JOBS_CFG = CFG.get("jobs", {})
+JOBS = JobManager(
+    max_workers=JOBS_CFG.get("max_workers", 2),
+    max_queue=JOBS_CFG.get("max_queue", 16),
+)
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    JOBS.shutdown(wait=False)
 
 
 def get_db() -> Session:
@@ -59,14 +90,22 @@ async def save_upload(upload: UploadFile, prefix: str) -> str:
     return tmp_path
 
 
-class EnrollmentResponse(BaseModel):
-    person_id: int
-    message: str
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
 
 
-class AttendanceProcessResponse(BaseModel):
-    events_logged: int
-    message: str
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    frames_processed: int
+    frames_total: Optional[int]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
 
 
 class PersonResponse(BaseModel):
@@ -86,6 +125,7 @@ class AttendanceEventResponse(BaseModel):
     timestamp: datetime
     score: float
     frame_idx: int
+    quality_score: Optional[float] = None
 
 
 @app.get("/health")
@@ -93,71 +133,158 @@ def health_check():
     return {"status": "ok"}
 
 
-@app.post("/enroll", response_model=EnrollmentResponse)
+@app.get("/metrics")
+def metrics():
+    """Stage latencies and pipeline counters in Prometheus text format."""
+    return Response(content=METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def _enroll_job(job, person_meta: dict, tmp_path: str):
+    try:
+        with session_scope(CFG) as session:
+            service = EnrollmentService(
+                PIPELINE,
+                session,
+                frame_skip=VIDEO_CFG.get("frame_skip", 3),
+                gallery=GALLERY,
+                max_templates=ENROLL_CFG.get("max_templates", 3),
+                max_similarity=ENROLL_CFG.get("max_similarity", 0.95),
+                good_quality=ENROLL_CFG.get("good_quality", 0.5),
+                stop_after=ENROLL_CFG.get("stop_after"),
+            )
+            person_id = service.enroll_from_video(
+                person_meta, tmp_path, progress_callback=job.report_progress
+            )
+        return {"person_id": person_id}
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _attendance_job(job, camera_id: str, tmp_path: str):
+    try:
+        with session_scope(CFG) as session:
+            service = AttendanceService(
+                PIPELINE,
+                session,
+                threshold=MATCH_CFG.get("threshold", 0.7),
+                frame_skip=VIDEO_CFG.get("frame_skip", 5),
+                gallery=GALLERY,
+                debounce_seconds=ATTENDANCE_CFG.get("debounce_seconds", 0.0),
+                insert_batch_size=ATTENDANCE_CFG.get("insert_batch_size", 500),
+                sampler=SAMPLER,
+            )
+            events_logged = service.process_video(
+                tmp_path, camera_id, progress_callback=job.report_progress
+            )
+        return {"events_logged": events_logged}
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _ensure_capacity():
+    if JOBS.active >= JOBS.max_workers + JOBS.max_queue:
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue is full, retry later",
+            headers={"Retry-After": "30"},
+        )
+
+
+def _submit(kind: str, fn, tmp_path: str, *args) -> JobResponse:
+    try:
+        job = JOBS.submit(kind, fn, *args, tmp_path)
+    except JobQueueFull as exc:
+        os.remove(tmp_path)
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "30"}
+        ) from exc
+    return JobResponse(job_id=job.id, status=job.status)
+
+
+@app.post("/enroll", response_model=JobResponse, status_code=202)
 async def enroll_person(
     name: str = Form(...),
     employee_code: str = Form(...),
     department: str = Form(""),
     video: UploadFile = File(...),
-    session: Session = Depends(get_db),
 ):
+    _ensure_capacity()
     tmp_path = await save_upload(video, "enroll")
-    person_id = None
-    try:
-        service = EnrollmentService(
-            PIPELINE,
-            session,
-            frame_skip=VIDEO_CFG.get("frame_skip", 3),
-        )
-        person_id = service.enroll_from_video(
-            {
-                "name": name.strip(),
-                "employee_code": employee_code.strip(),
-                "department": department.strip(),
-            },
-            tmp_path,
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-    return EnrollmentResponse(person_id=person_id, message="Enrollment completed")
+    person_meta = {
+        "name": name.strip(),
+        "employee_code": employee_code.strip(),
+        "department": department.strip(),
+    }
+    return _submit("enroll", _enroll_job, tmp_path, person_meta)
 
 
-@app.post("/attendance/process", response_model=AttendanceProcessResponse)
+@app.post("/attendance/process", response_model=JobResponse, status_code=202)
 async def process_attendance(
     camera_id: str = Form(...),
     video: UploadFile = File(...),
-    session: Session = Depends(get_db),
 ):
+    _ensure_capacity()
     tmp_path = await save_upload(video, "attendance")
-    events_logged = 0
-    try:
-        before_count = session.query(AttendanceEvent).count()
-        service = AttendanceService(
-            PIPELINE,
-            session,
-            threshold=MATCH_CFG.get("threshold", 0.7),
-            frame_skip=VIDEO_CFG.get("frame_skip", 5),
-        )
-        service.process_video(tmp_path, camera_id.strip())
-        after_count = session.query(AttendanceEvent).count()
-        events_logged = max(after_count - before_count, 0)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-    return AttendanceProcessResponse(
-        events_logged=events_logged,
-        message="Attendance processing completed",
+    return _submit("attendance", _attendance_job, tmp_path, camera_id.strip())
+
+
+def _job_status(job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        frames_processed=job.frames_processed,
+        frames_total=job.frames_total,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
     )
 
 
+@app.get("/jobs", response_model=List[JobStatusResponse])
+def list_jobs():
+    return [_job_status(job) for job in JOBS.list()]
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(limit, 200))
+
+
 @app.get("/persons", response_model=List[PersonResponse])
-def list_persons(session: Session = Depends(get_db)):
-    people = session.query(Person).order_by(Person.created_at.desc()).all()
+def list_persons(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    department: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    session: Session = Depends(get_db),
+):
+    try:
+        rows, next_cursor = queries.list_persons(
+            session,
+            limit=_clamp_limit(limit),
+            cursor=cursor,
+            department=department,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         PersonResponse(
             id=p.id,
@@ -165,21 +292,39 @@ def list_persons(session: Session = Depends(get_db)):
             employee_code=p.employee_code,
             department=p.department,
             created_at=p.created_at,
-            templates=len(p.iris_templates),
+            templates=p.templates,
         )
-        for p in people
+        for p in rows
     ]
 
 
 @app.get("/attendance/events", response_model=List[AttendanceEventResponse])
-def list_attendance_events(limit: int = 50, session: Session = Depends(get_db)):
-    limit = max(1, min(limit, 200))
-    events = (
-        session.query(AttendanceEvent)
-        .order_by(AttendanceEvent.timestamp.desc())
-        .limit(limit)
-        .all()
-    )
+def list_attendance_events(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    camera_id: Optional[str] = None,
+    person_id: Optional[int] = None,
+    department: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(get_db),
+):
+    try:
+        events, next_cursor = queries.list_events(
+            session,
+            limit=_clamp_limit(limit),
+            cursor=cursor,
+            camera_id=camera_id,
+            person_id=person_id,
+            department=department,
+            start=start,
+            end=end,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         AttendanceEventResponse(
             id=e.id,
@@ -188,6 +333,7 @@ def list_attendance_events(limit: int = 50, session: Session = Depends(get_db)):
             video_path=e.video_path,
             timestamp=e.timestamp,
             score=float(e.score),
+            quality_score=e.quality_score,
             frame_idx=e.frame_idx,
         )
         for e in events
@@ -0,0 +1,118 @@
+"""Recall vs. latency of the IVF index against exact search.
+
+The gallery is i.i.d. Gaussian 256-d embeddings (L2-normalized), two
+templates per person. Queries are genuine matches: a random gallery row
+rotated to a fixed cosine (``--similarities``) with it. Recall is top-1
+agreement of ``IrisMatcher.topk`` with exact search. Unstructured random
+data has no clusters for k-means to find, so this is a pessimistic case
+for IVF; real iris embeddings group by person and eye.
+
+Usage:
+    python benchmarks/bench_ann_index.py --sizes 10000 100000 1000000 --nprobe 4 16 64
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.ann_index import IVFIndex
+from core.matcher import IrisMatcher
+
+
+def make_gallery(n, dim, rng, chunk=100000):
+    gallery = np.empty((n, dim), dtype=np.float32)
+    for i in range(0, n, chunk):
+        part = rng.standard_normal((min(chunk, n - i), dim), dtype=np.float32)
+        part /= np.linalg.norm(part, axis=1, keepdims=True)
+        gallery[i:i + len(part)] = part
+    return gallery
+
+
+def genuine_queries(gallery, n, similarity, rng):
+    base = gallery[rng.choice(len(gallery), n, replace=False)]
+    noise = rng.standard_normal(base.shape, dtype=np.float32)
+    noise -= np.sum(noise * base, axis=1, keepdims=True) * base
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    return similarity * base + np.sqrt(1.0 - similarity ** 2) * noise
+
+
+def timed_top1(matcher, queries, batch):
+    start = time.perf_counter()
+    top = []
+    for i in range(0, len(queries), batch):
+        top.extend(row[0][0] for row in matcher.topk(queries[i:i + batch], k=1))
+    ms = (time.perf_counter() - start) / len(queries) * batch * 1e3
+    return np.array(top), ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF approximate search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--similarities", type=float, nargs="+", default=[0.7, 0.85])
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--batch", type=int, default=8, help="Queries per call (eyes per frame).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sims = " ".join(f"{'recall@' + str(s):>12}" for s in args.similarities)
+    print(f"{'templates':>10} {'search':>14} {'build s':>8} {'ms/batch':>9} {'speedup':>8} {sims}")
+    for n in args.sizes:
+        gallery = make_gallery(n, args.dim, rng)
+        person_ids = np.arange(n, dtype=np.int64) // 2
+        query_sets = [genuine_queries(gallery, args.queries, s, rng) for s in args.similarities]
+
+        exact = IrisMatcher().load_gallery(person_ids, gallery, normalized=True)
+        truth = []
+        exact_ms = []
+        for queries in query_sets:
+            top, ms = timed_top1(exact, queries, args.batch)
+            truth.append(top)
+            exact_ms.append(ms)
+        exact_ms = float(np.mean(exact_ms))
+        print(f"{n:>10} {'exact':>14} {'-':>8} {exact_ms:>9.2f} {'1.00x':>8} "
+              + " ".join(f"{1.0:>12.3f}" for _ in args.similarities))
+
+        configs = [(f"nprobe={p}", IVFIndex(nprobe=p, min_gallery=0, seed=args.seed)) for p in args.nprobe]
+        configs.append((f"recall>={args.target_recall}",
+                        IVFIndex(target_recall=args.target_recall, min_gallery=0, seed=args.seed)))
+        trained = None
+        for name, config in configs:
+            if trained is None or config.target_recall is not None:
+                start = time.perf_counter()
+                index = config.build(gallery)
+                build = f"{time.perf_counter() - start:.1f}"
+                if trained is None:
+                    trained = index
+            else:
+                # same partitions, different probe count
+                index = trained
+                index.nprobe = config.nprobe
+                build = "-"
+            approx = IrisMatcher().load_gallery(person_ids, gallery, normalized=True, index=index)
+            recalls = []
+            ms = []
+            for queries, top in zip(query_sets, truth):
+                found, q_ms = timed_top1(approx, queries, args.batch)
+                recalls.append(float(np.mean(found == top)))
+                ms.append(q_ms)
+            ms = float(np.mean(ms))
+            if config.target_recall is not None:
+                name = f"{name} ({index.nprobe})"
+            print(f"{'':>10} {name:>14} {build:>8} {ms:>9.2f} {exact_ms / ms:>7.2f}x "
+                  + " ".join(f"{r:>12.3f}" for r in recalls))
+        print(f"{'':>10} {len(trained.centroids)} partitions")
+        del gallery, exact, approx, trained, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Eye detection latency and recall at several detection scales.
+
+The cascade runs on a downscaled gray frame and boxes are mapped back to
+full resolution (``detector.scale`` / per-camera ``detection_scale``).
+Recall and mean IoU are measured against the boxes rendered into the
+synthetic clip, so lost accuracy from downscaling shows up directly.
+
+Usage:
+    python benchmarks/bench_detection_scale.py --resolution 1920x1080 --scales 1 0.75 0.5 0.35 0.25
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.bench_tracking import iou
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.iris_detector import IrisDetector
+from core.video_reader import VideoReader
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--frame-skip", type=int, default=3)
+    parser.add_argument("--faces", type=int, default=4)
+    parser.add_argument("--eye-size", type=int, default=None,
+                        help="Rendered eye size in pixels (default: frame height / 24).")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.35, 0.25])
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.split("x"))
+    cfg = load_config()
+    detector = IrisDetector(cfg["models"]["iritrack_cascade"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "eyes.mp4")
+        truth = write_eye_video(path, args.frames, width, height, faces=args.faces, eye_size=args.eye_size)
+        frames = list(VideoReader(frame_skip=args.frame_skip, prefetch=0).iter_frames(path))
+
+    truth_boxes = [[box for _, eyes in truth[idx] for box in eyes] for idx, _ in frames]
+    n_truth = sum(len(t) for t in truth_boxes)
+    eye_px = np.mean([b[2] - b[0] for boxes in truth_boxes for b in boxes])
+    print(f"{args.resolution}, {args.faces} faces, {len(frames)} sampled frames, "
+          f"eyes ~{eye_px:.0f}px wide")
+    print(f"{'scale':>6} {'ms/frame':>9} {'speedup':>8} {'recall':>7} {'mean IoU':>9} {'false +':>8}")
+
+    base_ms = None
+    for scale in args.scales:
+        detector.detect_eyes(frames[0][1], scale=scale)  # warm-up
+        found = []
+        start = time.perf_counter()
+        for _, frame in frames:
+            found.append([eye.bbox for eye in detector.detect_eyes(frame, scale=scale)])
+        ms = (time.perf_counter() - start) / len(frames) * 1e3
+        base_ms = base_ms or ms
+
+        hit_ious = []
+        false_pos = 0
+        for ref, boxes in zip(truth_boxes, found):
+            for box in ref:
+                best = max((iou(box, b) for b in boxes), default=0.0)
+                if best >= 0.3:
+                    hit_ious.append(best)
+            false_pos += sum(1 for b in boxes if max((iou(b, r) for r in ref), default=0.0) < 0.3)
+        recall = len(hit_ious) / max(1, n_truth)
+        mean_iou = float(np.mean(hit_ious)) if hit_ious else 0.0
+        print(f"{scale:>6.2f} {ms:>9.2f} {base_ms / ms:>7.2f}x {recall:>7.1%} {mean_iou:>9.2f} {false_pos:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""CPU throughput of IrisEncoder for different encoder batch sizes.
+
+Frames per second assume ``--eyes-per-frame`` strips per sampled frame.
+
+Usage:
+    python benchmarks/bench_encoder.py --batch-sizes 1 2 4 8 16 32 64
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from core.encoder import IrisEncoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched iris encoding on CPU.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--strips", type=int, default=256, help="Strips encoded per batch size.")
+    parser.add_argument("--eyes-per-frame", type=float, default=2.0)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cfg = load_config()
+    radial, angular = cfg["norm"]["radial_res"], cfg["norm"]["angular_res"]
+    encoder = IrisEncoder(None, device=args.device)
+    rng = np.random.default_rng(args.seed)
+    strips = rng.random((args.strips, radial, angular), dtype=np.float32)
+
+    # warm up allocator and kernels
+    encoder.encode_batch(strips[:4])
+
+    print(f"{'batch':>6} {'ms/batch':>10} {'strips/s':>10} {'frames/s':>10}")
+    for bs in args.batch_sizes:
+        start = time.perf_counter()
+        n_batches = 0
+        for i in range(0, len(strips), bs):
+            encoder.encode_batch(strips[i:i + bs])
+            n_batches += 1
+        elapsed = time.perf_counter() - start
+        strips_per_s = len(strips) / elapsed
+        print(
+            f"{bs:>6} {elapsed / n_batches * 1e3:>10.2f} {strips_per_s:>10.1f} "
+            f"{strips_per_s / args.eyes_per_frame:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
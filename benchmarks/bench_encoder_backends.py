@@ -0,0 +1,86 @@
+"""Latency, throughput and embedding agreement of the IrisEncoder backends.
+
+Every backend is built from the same fp32 weights. Cosine similarity is
+measured per strip against the eager fp32 embeddings; the ONNX backend is
+included when onnxruntime is installed and the model can be exported
+(needs the ``onnx`` package), otherwise it is reported as skipped.
+
+Usage:
+    python benchmarks/bench_encoder_backends.py --intra-op-threads 4 --inter-op-threads 1
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from core.encoder import BACKENDS, IrisEncoder, SimpleIrisEncoderNet
+
+
+def time_batches(encoder, strips, batch_size, repeats):
+    encoder.encode_batch(strips[:batch_size])  # warm-up / tracing
+    start = time.perf_counter()
+    n = 0
+    for _ in range(repeats):
+        for i in range(0, len(strips), batch_size):
+            encoder.encode_batch(strips[i:i + batch_size])
+            n += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / n * 1e3, repeats * len(strips) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--strips", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--intra-op-threads", type=int, default=None)
+    parser.add_argument("--inter-op-threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cfg = load_config()
+    shape = (cfg["norm"]["radial_res"], cfg["norm"]["angular_res"])
+    rng = np.random.default_rng(args.seed)
+    strips = rng.random((args.strips, *shape), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        torch.manual_seed(args.seed)
+        weights = str(Path(tmp) / "encoder.pth")
+        torch.save(SimpleIrisEncoderNet().state_dict(), weights)
+        onnx_path = str(Path(tmp) / "encoder.onnx")
+        threads = {"intra_op_threads": args.intra_op_threads, "inter_op_threads": args.inter_op_threads}
+
+        reference = IrisEncoder(weights, device="cpu", **threads).encode_batch(strips)
+        print(f"torch threads: intra-op {torch.get_num_threads()}, inter-op {torch.get_num_interop_threads()}")
+        print(f"{'backend':<12} {'ms (bs=1)':>10} {f'ms (bs={args.batch_size})':>12} "
+              f"{'strips/s':>9} {'cos mean':>9} {'cos min':>8}")
+        for backend in args.backends:
+            try:
+                if backend == "onnx":
+                    IrisEncoder(weights, device="cpu").export_onnx(onnx_path, shape)
+                encoder = IrisEncoder(weights, device="cpu", backend=backend, onnx_path=onnx_path, **threads)
+            except Exception as exc:  # optional dependencies missing
+                print(f"{backend:<12} skipped: {exc}")
+                continue
+            single_ms, _ = time_batches(encoder, strips[:32], 1, args.repeats)
+            batch_ms, throughput = time_batches(encoder, strips, args.batch_size, args.repeats)
+            emb = encoder.encode_batch(strips)
+            cos = np.sum(emb * reference, axis=1) / (
+                np.linalg.norm(emb, axis=1) * np.linalg.norm(reference, axis=1) + 1e-12
+            )
+            print(f"{backend:<12} {single_ms:>10.2f} {batch_ms:>12.2f} {throughput:>9.1f} "
+                  f"{cos.mean():>9.5f} {cos.min():>8.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Enrollment from a long clip: collect-then-average vs. streaming.
+
+The legacy path is what ``EnrollmentService`` did before streaming: keep
+every embedding in a list, ``np.stack`` + mean at the end, one averaged
+template. The streaming service keeps running sums and a bounded
+``TemplateSelector``, writes up to ``max_templates`` rows with the person
+in one transaction, and can stop once ``stop_after`` good samples are in.
+
+Memory is the tracemalloc peak during enrollment (NumPy/Python
+allocations; torch's allocator is not traced). A clip with no eyes checks
+that a failed enrollment leaves no ``persons`` row behind.
+
+Usage:
+    python benchmarks/bench_enrollment.py --frames 600 --stop-after 30
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.metrics import METRICS
+from core.pipeline import IrisPipeline
+from core.video_reader import VideoReader
+from db.db_utils import get_session_from_url, init_db
+from db.models import IrisTemplate, Person
+from services.enrollment_service import EnrollmentService
+
+
+def legacy_enroll(pipeline, session, person_meta, video_path, frame_skip):
+    person = Person(**person_meta)
+    session.add(person)
+    session.commit()
+    embeddings = []
+    qualities = []
+    frames = VideoReader(frame_skip=frame_skip).iter_frames(video_path)
+    for _, emb_data in pipeline.process_frames(frames):
+        for item in emb_data:
+            embeddings.append(item["embedding"])
+            qualities.append(item["quality"])
+    if len(embeddings) == 0:
+        raise RuntimeError("No iris embeddings extracted from enrollment video")
+    avg_emb = np.mean(np.stack(embeddings, axis=0), axis=0)
+    session.add(IrisTemplate(
+        person_id=person.id, embedding=avg_emb.tobytes(), quality_score=float(np.mean(qualities))
+    ))
+    session.commit()
+    return person.id
+
+
+def run(label, enroll, session, code, video_path):
+    METRICS.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    try:
+        enroll({"name": label, "employee_code": code}, video_path)
+    except RuntimeError as exc:
+        error = exc
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.rollback()
+    templates = session.query(IrisTemplate).join(Person).filter(Person.employee_code == code).count()
+    persons = session.query(Person).filter(Person.employee_code == code).count()
+    counters = METRICS.snapshot()["counters"]
+    status = f"failed ({error})" if error else "ok"
+    print(f"{label:<22} {elapsed:>7.2f} {counters['frames_decoded']:>8} {counters['eyes_detected']:>6} "
+          f"{peak / 2**20:>8.1f} {persons:>8} {templates:>10}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming enrollment.")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frame-skip", type=int, default=3)
+    parser.add_argument("--max-templates", type=int, default=3)
+    parser.add_argument("--stop-after", type=int, default=30)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.split("x"))
+    cfg = load_config()
+    cfg["metrics"] = {"enabled": True}
+    pipeline = IrisPipeline(cfg)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = str(Path(tmp) / "enroll.mp4")
+        empty = str(Path(tmp) / "empty.mp4")
+        write_eye_video(video, args.frames, width, height, faces=1)
+        write_eye_video(empty, 30, width, height, faces=1, visible={0: (10**6, 10**6)})
+        db_url = f"sqlite:///{tmp}/bench.db"
+        init_db(db_url)
+        session = get_session_from_url(db_url)()
+
+        def streaming(stop_after):
+            return EnrollmentService(
+                pipeline, session, frame_skip=args.frame_skip,
+                max_templates=args.max_templates, stop_after=stop_after,
+            ).enroll_from_video
+
+        def legacy(meta, path):
+            return legacy_enroll(pipeline, session, meta, path, args.frame_skip)
+
+        print(f"{args.frames} frames at {args.resolution}, frame skip {args.frame_skip}")
+        print(f"{'path':<22} {'seconds':>7} {'decoded':>8} {'eyes':>6} {'peak MB':>8} {'persons':>8} "
+              f"{'templates':>10}")
+        run("legacy", legacy, session, "L1", video)
+        run("streaming (full clip)", streaming(None), session, "S1", video)
+        run(f"streaming (stop {args.stop_after})", streaming(args.stop_after), session, "S2", video)
+        run("legacy, no eyes", legacy, session, "L2", empty)
+        run("streaming, no eyes", streaming(args.stop_after), session, "S3", empty)
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Attendance query latency on a large seeded database, before and after indexing.
+
+Seeds a temporary SQLite database (1M events by default), drops the model
+indexes to mimic a pre-index database, times the common queries, runs the
+migration, and times them again.
+
+Usage:
+    python benchmarks/bench_event_queries.py --events 1000000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, insert, text
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from db.db_utils import get_engine, get_session_from_url
+from db.migrations import upgrade
+from db.models import AttendanceEvent, Base, IrisTemplate, Person
+
+
+def seed(engine, n_events, n_persons, n_cameras, seed_value=0):
+    rng = np.random.default_rng(seed_value)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Person),
+            [{"name": f"P{i}", "employee_code": f"E{i:06d}", "department": f"D{i % 20}",
+              "created_at": start} for i in range(n_persons)],
+        )
+        emb = np.zeros(256, dtype=np.float32).tobytes()
+        conn.execute(
+            insert(IrisTemplate),
+            [{"person_id": i % n_persons + 1, "embedding": emb, "eye_side": "unknown",
+              "created_at": start} for i in range(2 * n_persons)],
+        )
+    chunk = 100_000
+    for lo in range(0, n_events, chunk):
+        n = min(chunk, n_events - lo)
+        persons = rng.integers(1, n_persons + 1, n)
+        cameras = rng.integers(0, n_cameras, n)
+        seconds = rng.integers(0, 365 * 86400, n)
+        scores = rng.random(n)
+        rows = [
+            {
+                "person_id": int(p),
+                "camera_id": f"CAM{int(c):02d}",
+                "video_path": "seed.mp4",
+                "timestamp": start + timedelta(seconds=int(s)),
+                "score": float(sc),
+                "frame_idx": i,
+                "created_at": start,
+            }
+            for i, (p, c, s, sc) in enumerate(zip(persons, cameras, seconds, scores))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(AttendanceEvent), rows)
+
+
+def queries(session):
+    start = datetime(2025, 6, 1)
+    end = start + timedelta(days=7)
+    return {
+        "latest 50 events": lambda: session.query(AttendanceEvent)
+        .order_by(AttendanceEvent.timestamp.desc()).limit(50).all(),
+        "person history (50)": lambda: session.query(AttendanceEvent)
+        .filter(AttendanceEvent.person_id == 7)
+        .order_by(AttendanceEvent.timestamp.desc()).limit(50).all(),
+        "camera, 1 week": lambda: session.query(func.count(AttendanceEvent.id))
+        .filter(AttendanceEvent.camera_id == "CAM03",
+                AttendanceEvent.timestamp >= start, AttendanceEvent.timestamp < end).scalar(),
+        "templates of person": lambda: session.query(IrisTemplate.id)
+        .filter(IrisTemplate.person_id == 7).all(),
+        "Query.count()": lambda: session.query(AttendanceEvent).count(),
+        "count(*)": lambda: session.query(func.count()).select_from(AttendanceEvent).scalar(),
+    }
+
+
+def time_queries(session, repeats):
+    results = {}
+    for name, fn in queries(session).items():
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark attendance queries and indexes.")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--persons", type=int, default=2000)
+    parser.add_argument("--cameras", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = get_engine(url)
+        Base.metadata.create_all(engine)
+        # start from a pre-index schema so the migration path is exercised
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+        start = time.perf_counter()
+        seed(engine, args.events, args.persons, args.cameras)
+        print(f"seeded {args.events} events in {time.perf_counter() - start:.1f}s")
+
+        session = get_session_from_url(url)()
+        before = time_queries(session, args.repeats)
+        start = time.perf_counter()
+        created = upgrade(engine)
+        indexes = [name for name in created if name.startswith("ix_")]
+        print(f"migration created {len(indexes)} indexes in {time.perf_counter() - start:.1f}s")
+        after = time_queries(session, args.repeats)
+        session.close()
+
+    print(f"{'query':>22} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in before:
+        print(f"{name:>22} {before[name] * 1e3:>10.2f} {after[name] * 1e3:>10.2f} "
+              f"{before[name] / max(after[name], 1e-9):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-eye memory and latency: copied BGR crops vs. ``EyeSample`` views.
+
+The legacy path is what the pipeline did before ``EyeSample``: copy the
+BGR crop, convert it to gray and rasterize a mask in the segmenter,
+recover the circle with ``np.where`` over the mask, and convert the crop
+to gray again in the normalizer. The new path works on a view into the
+frame's single gray conversion and reuses the Hough circle directly.
+
+Memory is the tracemalloc peak above the starting point while one eye is
+processed (NumPy and OpenCV output arrays are traced; OpenCV's internal
+scratch buffers are not). Both paths produce strips for the same eyes;
+geometry differs slightly because the mask centroid of a clipped circle is
+no longer used.
+
+Usage:
+    python benchmarks/bench_eye_sample.py --resolution 1280x720 --frames 60
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.pipeline import IrisPipeline
+from core.video_reader import VideoReader
+
+
+def legacy_eye(pipeline, frame, bbox):
+    x0, y0, x1, y1 = bbox
+    crop = frame[y0:y1, x0:x1].copy()
+    mask = pipeline.segmenter.segment(crop)
+    geometry = pipeline.normalizer.estimate_geometry_from_mask(mask)
+    return pipeline.normalizer.normalize(crop, mask, *geometry)
+
+
+def sample_eye(pipeline, sample):
+    return pipeline.normalize_sample(sample)
+
+
+def measure(fn, items):
+    peaks = []
+    start = time.perf_counter()
+    for args in items:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    elapsed = time.perf_counter() - start
+    return np.mean(peaks), elapsed / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--faces", type=int, default=4)
+    parser.add_argument("--eye-size", type=int, default=None)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.split("x"))
+    cfg = load_config()
+    cfg["device"] = "cpu"
+    pipeline = IrisPipeline(cfg)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "eyes.mp4")
+        write_eye_video(path, args.frames, width, height, faces=args.faces, eye_size=args.eye_size)
+        frames = [frame for _, frame in VideoReader(frame_skip=2, prefetch=0).iter_frames(path)]
+
+    samples = [(frame, eye) for frame in frames for eye in pipeline.detector.detect_eyes(frame)]
+    legacy_items = [(pipeline, frame, eye.bbox) for frame, eye in samples]
+    sample_items = [(pipeline, eye) for _, eye in samples]
+    # warm the per-thread remap buffers and the cascade before tracing
+    legacy_eye(*legacy_items[0])
+    sample_eye(*sample_items[0])
+
+    tracemalloc.start()
+    legacy_peak, legacy_us = measure(legacy_eye, legacy_items)
+    sample_peak, sample_us = measure(sample_eye, sample_items)
+    tracemalloc.stop()
+
+    eye_px = np.mean([eye.gray.size for _, eye in samples])
+    print(f"{len(samples)} eyes (~{eye_px:.0f} px each)")
+    print(f"{'path':<10} {'peak KiB/eye':>13} {'us/eye':>9}")
+    print(f"{'legacy':<10} {legacy_peak / 1024:>13.1f} {legacy_us:>9.1f}")
+    print(f"{'EyeSample':<10} {sample_peak / 1024:>13.1f} {sample_us:>9.1f}")
+    print(f"peak memory {legacy_peak / max(1.0, sample_peak):.1f}x lower, "
+          f"{legacy_us / sample_us:.2f}x faster per eye")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Gallery startup from the database vs. a memory-mapped snapshot.
+
+Seeds a throwaway SQLite database with random templates, exports it with
+``export_snapshot`` and times how long a fresh process-style gallery
+takes to become ready to match (gallery load + ``IrisMatcher.load_gallery``)
+each way. Heap is measured with tracemalloc, so the mapped snapshot pages
+(shared through the page cache) don't count. A second pass adds
+``--delta`` templates after the export to show a stale snapshot being
+topped up from the database.
+
+Usage:
+    python benchmarks/bench_gallery_snapshot.py --sizes 10000 100000 --delta 100
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import insert
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.matcher import IrisMatcher
+from db.db_utils import get_session_from_url, init_db
+from db.models import IrisTemplate, Person
+from services.template_gallery import TemplateGallery, export_snapshot
+
+MODEL_VERSION = "bench"
+
+
+def add_templates(session, n, dim, rng, first_person):
+    session.execute(
+        insert(Person),
+        [{"name": f"Bench {i}", "employee_code": f"SNAP{i:08d}"} for i in range(first_person, first_person + n)],
+    )
+    person_ids = [pid for (pid,) in session.query(Person.id).filter(Person.employee_code >= f"SNAP{first_person:08d}")]
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    session.execute(
+        insert(IrisTemplate),
+        [
+            {"person_id": pid, "embedding": emb.tobytes(), "quality_score": 1.0}
+            for pid, emb in zip(person_ids, embeddings)
+        ],
+    )
+    session.commit()
+
+
+def timed_startup(session, snapshot_dir):
+    """``(ms, heap peak MB, matcher, used_snapshot)`` for one cold start."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    gallery = TemplateGallery()
+    used = snapshot_dir is not None and gallery.load_snapshot(snapshot_dir, session, MODEL_VERSION)
+    gallery.refresh(session)
+    _, person_ids, embeddings, _ = gallery.snapshot()
+    matcher = IrisMatcher().load_gallery(person_ids, embeddings, normalized=True)
+    ms = (time.perf_counter() - start) * 1e3
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, peak / 2**20, matcher, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gallery startup from DB vs. snapshot.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--delta", type=int, default=100, help="Templates added after the export.")
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'templates':>10} {'export s':>9} {'db ms':>9} {'db MB':>8} {'mmap ms':>9} {'mmap MB':>8} "
+          f"{'speedup':>8} {'stale ms':>9} {'same':>5}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_url = f"sqlite:///{tmp}/bench.db"
+            init_db(db_url)
+            session = get_session_from_url(db_url)()
+            add_templates(session, n, args.dim, rng, 0)
+            snapshot_dir = str(Path(tmp) / "snapshot")
+
+            start = time.perf_counter()
+            export_snapshot(session, snapshot_dir, MODEL_VERSION)
+            export_s = time.perf_counter() - start
+            session.commit()
+
+            db_ms, db_mb, db_matcher, _ = timed_startup(session, None)
+            snap_ms, snap_mb, snap_matcher, used = timed_startup(session, snapshot_dir)
+            assert used, "snapshot was not used"
+
+            queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+            same = db_matcher.match_batch(queries) == snap_matcher.match_batch(queries)
+
+            add_templates(session, args.delta, args.dim, rng, n)
+            stale_ms, _, stale_matcher, used = timed_startup(session, snapshot_dir)
+            assert used and len(stale_matcher) == n + args.delta
+            session.close()
+
+        print(f"{n:>10} {export_s:>9.2f} {db_ms:>9.1f} {db_mb:>8.1f} {snap_ms:>9.1f} {snap_mb:>8.1f} "
+              f"{db_ms / snap_ms:>7.1f}x {stale_ms:>9.1f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare the vectorized IrisMatcher against the original per-template loop.
+
+Usage:
+    python benchmarks/bench_matcher.py --sizes 1000 10000 100000 --queries 8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.matcher import IrisMatcher, cosine_similarity
+
+
+def loop_match(query_emb, enrolled_templates, threshold):
+    """The pre-vectorization matcher, kept here as the baseline."""
+    best_score = -1.0
+    best_person = None
+    for t in enrolled_templates:
+        score = cosine_similarity(query_emb, t["embedding"])
+        if score > best_score:
+            best_score = score
+            best_person = t["person_id"]
+    if best_score >= threshold:
+        return best_person, best_score
+    return None, best_score
+
+
+def make_gallery(n, dim, rng):
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    person_ids = np.arange(n, dtype=np.int64)
+    templates = [{"person_id": int(p), "embedding": e} for p, e in zip(person_ids, embeddings)]
+    return templates
+
+
+def time_call(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark iris matching strategies.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=8, help="Queries per batch (eyes per frame).")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'templates':>10} {'loop ms':>10} {'vector ms':>10} {'topk ms':>10} {'speedup':>8}")
+    for n in args.sizes:
+        templates = make_gallery(n, args.dim, rng)
+        # queries are noisy copies of enrolled templates so both paths match
+        picks = rng.integers(0, n, size=args.queries)
+        queries = np.stack([templates[i]["embedding"] for i in picks])
+        queries += 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+
+        matcher = IrisMatcher(threshold=0.7)
+        matcher.set_gallery(templates)
+
+        loop_s = time_call(lambda: [loop_match(q, templates, 0.7) for q in queries], args.repeats)
+        vec_s = time_call(lambda: matcher.match_batch(queries), args.repeats)
+        topk_s = time_call(lambda: matcher.topk(queries, k=5), args.repeats)
+
+        expected = [loop_match(q, templates, 0.7)[0] for q in queries]
+        got = [pid for pid, _ in matcher.match_batch(queries)]
+        if expected != got:
+            print(f"WARNING: vectorized matches differ from loop at n={n}")
+
+        print(
+            f"{n:>10} {loop_s * 1e3:>10.2f} {vec_s * 1e3:>10.2f} "
+            f"{topk_s * 1e3:>10.2f} {loop_s / vec_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Fixed frame skip vs. motion-adaptive sampling on synthetic CCTV.
+
+The corridor clip is an empty scene with ``--visits`` people passing
+through at random times, each visible for ``--pass-frames`` frames. A
+visit counts as caught if some frame the pipeline processed inside its
+window produced an embedding over that person's eyes (IoU >= 0.3);
+latency is the time from entry to that first frame. The busy clip keeps
+every face in view the whole time, which is where ``budget`` caps the work.
+Seconds cover decoding, motion scoring and the pipeline.
+
+Usage:
+    python benchmarks/bench_motion_sampler.py --frames 3000 --visits 12 --skips 5 10
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.bench_tracking import iou
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.metrics import METRICS
+from core.motion_sampler import MotionSampler
+from core.pipeline import IrisPipeline
+from core.video_reader import VideoReader
+
+
+def make_visits(n_frames, visits, pass_frames, rng):
+    low, high = pass_frames
+    visible = {}
+    for face in range(visits):
+        length = int(rng.integers(low, high + 1))
+        first = int(rng.integers(0, n_frames - length))
+        visible[face] = (first, first + length - 1)
+    return visible
+
+
+def run(pipeline, reader, video, truth, visible, fps):
+    METRICS.reset()
+    caught = {}
+    frames = 0
+    start = time.perf_counter()
+    for frame_idx, emb_data in pipeline.process_frames(reader.iter_frames(video)):
+        frames += 1
+        boxes = [item["bbox"] for item in emb_data]
+        for face, eyes in truth[frame_idx]:
+            if face in caught:
+                continue
+            if any(iou(eye, box) >= 0.3 for eye in eyes for box in boxes):
+                caught[face] = frame_idx
+    seconds = time.perf_counter() - start
+    latency = [(caught[face] - visible[face][0]) / fps * 1e3 for face in caught]
+    return {
+        "frames": frames,
+        "decoded": METRICS.snapshot()["counters"]["frames_decoded"],
+        "seconds": seconds,
+        "caught": len(caught),
+        "latency": latency,
+    }
+
+
+def report(label, stats, visits, n_frames):
+    latency = stats["latency"]
+    mean = f"{np.mean(latency):.0f}" if latency else "-"
+    worst = f"{np.max(latency):.0f}" if latency else "-"
+    print(f"{label:<14} {stats['frames']:>7} {stats['frames'] / n_frames:>7.1%} {stats['decoded']:>8} "
+          f"{stats['seconds']:>8.1f} {stats['caught']:>4}/{visits:<4} {mean:>8} {worst:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark motion-adaptive frame sampling.")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--visits", type=int, default=12)
+    parser.add_argument("--pass-frames", type=int, nargs=2, default=[8, 60], metavar=("MIN", "MAX"))
+    parser.add_argument("--busy-frames", type=int, default=500)
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--skips", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.split("x"))
+    cfg = load_config()
+    cfg["metrics"] = {"enabled": True}
+    pipeline = IrisPipeline(cfg)
+    motion = dict(cfg.get("video", {}).get("motion") or {}, enabled=True)
+    sampler = MotionSampler.from_config(motion)
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corridor = str(Path(tmp) / "corridor.mp4")
+        busy = str(Path(tmp) / "busy.mp4")
+        visible = make_visits(args.frames, args.visits, args.pass_frames, rng)
+        clips = [
+            ("corridor", corridor, args.frames, args.visits, visible,
+             write_eye_video(corridor, args.frames, width, height, faces=args.visits,
+                             fps=args.fps, seed=args.seed, visible=visible)),
+            ("busy", busy, args.busy_frames, 4, {face: (0, args.busy_frames - 1) for face in range(4)},
+             write_eye_video(busy, args.busy_frames, width, height, faces=4,
+                             fps=args.fps, seed=args.seed)),
+        ]
+        for name, video, n_frames, visits, windows, truth in clips:
+            print(f"{name}: {n_frames} frames at {args.resolution}, {visits} visit(s)")
+            print(f"{'sampling':<14} {'frames':>7} {'share':>7} {'decoded':>8} {'seconds':>8} "
+                  f"{'caught':>9} {'mean ms':>8} {'max ms':>8}")
+            for skip in args.skips:
+                stats = run(pipeline, VideoReader(frame_skip=skip), video, truth, windows, args.fps)
+                report(f"skip {skip}", stats, visits, n_frames)
+            stats = run(pipeline, VideoReader(sampler=sampler), video, truth, windows, args.fps)
+            report("motion", stats, visits, n_frames)
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-eye latency of DaugmanNormalizer vs. the original NumPy sampler.
+
+Also checks that both produce the same strip within the documented
+tolerance (max abs difference 2e-2 on the [0,1] output).
+
+Usage:
+    python benchmarks/bench_normalization.py --eyes 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from core.normalization import DaugmanNormalizer
+
+TOLERANCE = 2e-2
+
+
+def reference_normalize(eye_crop, iris_mask, pupil_center, pupil_radius, iris_radius,
+                        radial_res=64, angular_res=512):
+    """The pre-remap implementation, kept here as the baseline."""
+    cx, cy = pupil_center
+    H, W = iris_mask.shape[:2]
+    theta = np.linspace(0, 2 * np.pi, angular_res, endpoint=False)
+    r = np.linspace(0, 1, radial_res)
+    r_mat = pupil_radius + r[:, None] * (iris_radius - pupil_radius)
+    theta_mat = theta[None, :]
+    x = cx + r_mat * np.cos(theta_mat)
+    y = cy + r_mat * np.sin(theta_mat)
+    x = np.clip(x, 0, W - 1)
+    y = np.clip(y, 0, H - 1)
+    gray = cv2.cvtColor(eye_crop, cv2.COLOR_BGR2GRAY).astype(np.float32)
+    x0 = np.floor(x).astype(np.int32)
+    x1 = np.clip(x0 + 1, 0, W - 1)
+    y0 = np.floor(y).astype(np.int32)
+    y1 = np.clip(y0 + 1, 0, H - 1)
+    Ia = gray[y0, x0]
+    Ib = gray[y0, x1]
+    Ic = gray[y1, x0]
+    Id = gray[y1, x1]
+    wa = (x1 - x) * (y1 - y)
+    wb = (x - x0) * (y1 - y)
+    wc = (x1 - x) * (y - y0)
+    wd = (x - x0) * (y - y0)
+    norm = wa * Ia + wb * Ib + wc * Ic + wd * Id
+    norm = (norm - norm.min()) / (norm.max() - norm.min() + 1e-6)
+    return norm.astype(np.float32)
+
+
+def make_eyes(n, rng):
+    eyes = []
+    for _ in range(n):
+        size = int(rng.integers(48, 160))
+        crop = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        crop = cv2.GaussianBlur(crop, (5, 5), 0)
+        mask = np.zeros((size, size), dtype=np.uint8)
+        # centres near the middle, radii that sometimes leave the crop
+        cx, cy = (int(v) for v in rng.integers(size // 3, 2 * size // 3, size=2))
+        iris_radius = int(rng.integers(size // 6, size // 2))
+        pupil_radius = max(iris_radius // 2, 1)
+        eyes.append((crop, mask, (cx, cy), pupil_radius, iris_radius))
+    return eyes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Daugman normalization.")
+    parser.add_argument("--eyes", type=int, default=500)
+    parser.add_argument("--radial-res", type=int, default=64)
+    parser.add_argument("--angular-res", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    eyes = make_eyes(args.eyes, rng)
+    normalizer = DaugmanNormalizer(args.radial_res, args.angular_res)
+
+    start = time.perf_counter()
+    ref = [reference_normalize(*e, args.radial_res, args.angular_res) for e in eyes]
+    ref_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [normalizer.normalize(*e) for e in eyes]
+    new_s = time.perf_counter() - start
+
+    diffs = np.array([np.abs(a - b).max() for a, b in zip(ref, new)])
+    mean_diff = float(np.mean([np.abs(a - b).mean() for a, b in zip(ref, new)]))
+    print(f"reference: {ref_s / len(eyes) * 1e6:8.1f} us/eye")
+    print(f"remap:     {new_s / len(eyes) * 1e6:8.1f} us/eye  ({ref_s / new_s:.1f}x)")
+    print(f"max |diff|: {diffs.max():.2e}  mean |diff|: {mean_diff:.2e}")
+    if diffs.max() > TOLERANCE:
+        print(f"FAIL: difference exceeds tolerance {TOLERANCE}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
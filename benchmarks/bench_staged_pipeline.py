@@ -0,0 +1,131 @@
+"""Sequential vs. staged IrisPipeline on a synthetic eye video.
+
+For each detector mode (full scans and ``tracking``), checks that both
+pipeline modes produce identical per-frame embeddings and identical
+attendance events, and reports wall-clock throughput. Events are matched
+against a gallery enrolled from the first frame with eyes.
+
+Usage:
+    python benchmarks/bench_staged_pipeline.py --frames 100 --faces 4 --prepare-workers 2
+"""
+import argparse
+import copy
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.pipeline import IrisPipeline
+from core.video_reader import VideoReader
+from db.db_utils import get_session_from_url, init_db
+from db.models import IrisTemplate, Person
+from services.attendance_service import AttendanceService
+
+
+def run(pipeline, video, frame_skip):
+    frames = VideoReader(frame_skip=frame_skip).iter_frames(video)
+    start = time.perf_counter()
+    results = list(pipeline.process_frames(frames))
+    return results, time.perf_counter() - start
+
+
+def enroll(db_url, results):
+    """One person per eye of the first frame with eyes."""
+    session = get_session_from_url(db_url)()
+    first = next((emb for _, emb in results if emb), [])
+    for i, item in enumerate(first):
+        person = Person(name=f"eye {i}", employee_code=f"EYE{i}")
+        session.add(person)
+        session.flush()
+        session.add(IrisTemplate(person_id=person.id, embedding=item["embedding"].tobytes()))
+    session.commit()
+    session.close()
+
+
+def events(pipeline, video, frame_skip, db_url):
+    session = get_session_from_url(db_url)()
+    service = AttendanceService(pipeline, session, frame_skip=frame_skip)
+    rows = [
+        (row["person_id"], row["frame_idx"], row["score"])
+        for batch in service.iter_video_events(video, "BENCH")
+        for row in batch
+    ]
+    session.close()
+    return rows
+
+
+def same_results(a, b):
+    return [i for i, _ in a] == [i for i, _ in b] and all(
+        len(x) == len(y)
+        and all(np.array_equal(p["embedding"], q["embedding"]) and p["bbox"] == q["bbox"]
+                for p, q in zip(x, y))
+        for (_, x), (_, y) in zip(a, b)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the staged pipeline mode.")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--faces", type=int, default=4)
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--prepare-workers", type=int, default=2)
+    parser.add_argument("--encode-workers", type=int, default=1)
+    parser.add_argument("--detector-modes", nargs="+", default=["full", "tracking"])
+    args = parser.parse_args()
+
+    cfg = load_config()
+    cfg["device"] = "cpu"
+    identical = True
+    with tempfile.TemporaryDirectory() as tmp:
+        video = str(Path(tmp) / "eyes.mp4")
+        write_eye_video(video, args.frames, args.width, args.height, faces=args.faces)
+        encoder = None
+        for detector_mode in args.detector_modes:
+            seq_cfg = copy.deepcopy(cfg)
+            seq_cfg.setdefault("detector", {})["mode"] = detector_mode
+            staged_cfg = copy.deepcopy(seq_cfg)
+            staged_cfg["pipeline"].update(
+                mode="staged",
+                prepare_workers=args.prepare_workers,
+                encode_workers=args.encode_workers,
+            )
+            sequential = IrisPipeline(seq_cfg)
+            staged = IrisPipeline(staged_cfg)
+            # same weights, so any difference comes from the execution mode
+            encoder = encoder or sequential.encoder
+            sequential.encoder = staged.encoder = encoder
+
+            seq_results, seq_s = run(sequential, video, args.frame_skip)
+            stg_results, stg_s = run(staged, video, args.frame_skip)
+            same = same_results(seq_results, stg_results)
+
+            db_url = f"sqlite:///{tmp}/{detector_mode}.db"
+            init_db(db_url)
+            enroll(db_url, seq_results)
+            seq_events = events(sequential, video, args.frame_skip, db_url)
+            stg_events = events(staged, video, args.frame_skip, db_url)
+            same_events = seq_events == stg_events
+            identical = identical and same and same_events
+
+            n = len(seq_results)
+            eyes = sum(len(e) for _, e in seq_results)
+            print(f"detector {detector_mode}: {n} frames, {eyes} eyes, {len(seq_events)} events")
+            print(f"  sequential: {seq_s:7.2f} s  ({n / seq_s:6.1f} frames/s)")
+            print(f"  staged:     {stg_s:7.2f} s  ({n / stg_s:6.1f} frames/s, {seq_s / stg_s:.2f}x)")
+            print(f"  identical results: {same}, identical events: {same_events}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
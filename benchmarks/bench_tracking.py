@@ -0,0 +1,94 @@
+"""Full-frame vs. ROI-tracked eye detection on synthetic eye videos.
+
+For each clip every sampled frame is run through ``IrisDetector`` over the
+whole frame and through ``EyeTracker`` at a few full-scan intervals.
+Reports detection latency, pixels scanned, how many full-frame detections
+the tracker missed (IoU < 0.5), and recall against the rendered ground
+truth. The "late entry" clip has half the faces appear mid-way, which
+shows how long new faces wait for the next full scan.
+
+Usage:
+    python benchmarks/bench_tracking.py --resolution 1920x1080 --frames 150 --frame-skip 5
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.eye_tracker import EyeTracker
+from core.iris_detector import IrisDetector
+from core.video_reader import VideoReader
+
+
+def iou(a, b):
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
+
+
+def hits(reference, found, min_iou=0.5):
+    return sum(1 for ref in reference if any(iou(ref, box) >= min_iou for box in found))
+
+
+def run(detect, frames):
+    boxes = []
+    start = time.perf_counter()
+    for _, frame in frames:
+        boxes.append([eye.bbox for eye in detect(frame)])
+    return boxes, (time.perf_counter() - start) / len(frames) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--frame-skip", type=int, default=5)
+    parser.add_argument("--faces", type=int, default=4)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--padding", type=float, default=0.5)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.split("x"))
+    cfg = load_config()
+    detector = IrisDetector(cfg["models"]["iritrack_cascade"])
+    late = {face: (args.frames // 2, args.frames - 1) for face in range(args.faces // 2, args.faces)}
+    clips = {"steady": None, "late entry": late}
+
+    print(f"{args.resolution}, {args.faces} faces, {args.frames} frames, frame_skip={args.frame_skip}")
+    print(f"{'clip':<11} {'mode':<13} {'ms/frame':>9} {'Mpx/frame':>10} {'full scans':>11} "
+          f"{'missed vs full':>15} {'recall':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for clip, visible in clips.items():
+            path = str(Path(tmp) / "eyes.mp4")
+            truth = write_eye_video(path, args.frames, width, height, faces=args.faces, visible=visible)
+            frames = list(VideoReader(frame_skip=args.frame_skip, prefetch=0).iter_frames(path))
+            truth_boxes = [[box for _, eyes in truth[idx] for box in eyes] for idx, _ in frames]
+            n_truth = sum(len(t) for t in truth_boxes)
+
+            full_boxes, full_ms = run(detector.detect_eyes, frames)
+            n_full = sum(len(b) for b in full_boxes)
+            recall = sum(hits(t, f) for t, f in zip(truth_boxes, full_boxes)) / max(1, n_truth)
+            print(f"{clip:<11} {'full':<13} {full_ms:>9.2f} {width * height / 1e6:>10.2f} "
+                  f"{len(frames):>11} {'-':>15} {recall:>7.1%}")
+
+            for interval in args.intervals:
+                tracker = EyeTracker(detector, padding=args.padding, full_scan_interval=interval)
+                boxes, ms = run(tracker.detect_eyes, frames)
+                missed = n_full - sum(hits(f, b) for f, b in zip(full_boxes, boxes))
+                recall = sum(hits(t, b) for t, b in zip(truth_boxes, boxes)) / max(1, n_truth)
+                print(f"{clip:<11} {f'tracking/{interval}':<13} {ms:>9.2f} "
+                      f"{tracker.pixels_scanned / len(frames) / 1e6:>10.2f} {tracker.full_scans:>11} "
+                      f"{missed / max(1, n_full):>15.1%} {recall:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
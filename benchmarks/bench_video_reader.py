@@ -0,0 +1,89 @@
+"""Decode cost of VideoReader vs. the original read-every-frame loop.
+
+Generates a synthetic video locally, then times sampling it with the given
+``frame_skip``. ``--work-ms`` simulates per-frame pipeline work so the
+effect of background prefetching is visible.
+
+Usage:
+    python benchmarks/bench_video_reader.py --frame-skip 5 --work-ms 5
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_synthetic_video
+from core.video_reader import VideoReader
+
+
+def read_every_frame(video_path, frame_skip):
+    """The pre-grab implementation, kept here as the baseline."""
+    cap = cv2.VideoCapture(video_path)
+    frame_idx = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_idx % frame_skip == 0:
+            yield frame_idx, frame
+        frame_idx += 1
+    cap.release()
+
+
+def run(frames, work_s):
+    start = time.perf_counter()
+    n = 0
+    for _ in frames:
+        if work_s:
+            time.sleep(work_s)
+        n += 1
+    return n, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sampled video decoding.")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frame-skip", type=int, default=5)
+    parser.add_argument("--work-ms", type=float, default=0.0,
+                        help="Simulated per-frame processing time (sleep, releases the GIL).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = str(Path(tmp) / "synthetic.mp4")
+        write_synthetic_video(video, args.frames, args.width, args.height)
+        work_s = args.work_ms / 1000.0
+
+        cases = [
+            ("read every frame", lambda: read_every_frame(video, args.frame_skip)),
+            ("grab + retrieve", lambda: VideoReader(args.frame_skip, prefetch=0).iter_frames(video)),
+            ("grab + prefetch(4)", lambda: VideoReader(args.frame_skip, prefetch=4).iter_frames(video)),
+        ]
+        sparse = list(range(0, args.frames, args.frame_skip * 10))
+        cases.append(
+            (
+                f"seek ({len(sparse)} positions)",
+                lambda: VideoReader(prefetch=0).iter_positions(video, frame_indices=sparse),
+            )
+        )
+
+        print(f"{args.frames} frames {args.width}x{args.height}, frame_skip={args.frame_skip}, "
+              f"work={args.work_ms}ms/frame")
+        baseline = None
+        for name, make in cases:
+            n, elapsed = run(make(), work_s)
+            baseline = baseline or elapsed
+            print(f"{name:>22}: {n:4d} frames in {elapsed * 1e3:8.1f} ms "
+                  f"({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
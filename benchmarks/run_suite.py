@@ -0,0 +1,309 @@
+"""End-to-end benchmark suite on deterministic synthetic eye videos.
+
+For every scenario (resolution x face count) a clip is generated locally,
+then each stage is timed on its own (decode, detection, segmentation,
+normalization, encoding, matching, DB write) followed by full
+``AttendanceService.process_video`` runs against a temporary database,
+alternating with instrumentation (``core.metrics``) switched off and on
+to measure its overhead.
+Results are written as JSON; pass ``--baseline`` with an earlier file to
+flag stages that got slower.
+
+Usage:
+    python benchmarks/run_suite.py --output bench.json
+    python benchmarks/run_suite.py --output new.json --baseline bench.json --fail-on-regression
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import torch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synthetic import write_eye_video
+from config.config_loader import load_config
+from core.matcher import IrisMatcher
+from core.metrics import METRICS
+from core.pipeline import IrisPipeline
+from core.video_reader import VideoReader
+from db.db_utils import get_session_from_url, init_db
+from db.models import IrisTemplate, Person
+from services.attendance_service import AttendanceService
+from services.event_writer import EventWriter
+from services.template_gallery import TemplateGallery
+
+RESOLUTIONS = {"480p": (640, 480), "720p": (1280, 720), "1080p": (1920, 1080)}
+STAGES = ("decode", "detect", "quality", "segment", "normalize", "encode", "match", "db_write", "process_video")
+METRICS_MODES = {"process_video": True, "process_video_no_metrics": False}
+
+
+class StageTimes:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def timed(self, stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        out = {}
+        for stage, values in self.samples.items():
+            arr = np.asarray(values) * 1e3
+            out[stage] = {
+                "count": len(values),
+                "total_s": float(arr.sum() / 1e3),
+                "mean_ms": float(arr.mean()),
+                "p50_ms": float(np.percentile(arr, 50)),
+                "p95_ms": float(np.percentile(arr, 95)),
+            }
+        return out
+
+
+def seed_gallery(session, pipeline, frame, gallery_size, rng):
+    """Enroll the eyes visible in ``frame`` plus random filler templates."""
+    eyes = pipeline.process_frame(frame)
+    persons = [Person(name=f"Bench {i}", employee_code=f"BENCH{i:06d}") for i in range(gallery_size)]
+    session.add_all(persons)
+    session.flush()
+    templates = []
+    for i, person in enumerate(persons):
+        if i < len(eyes):
+            emb = eyes[i]["embedding"]
+        else:
+            emb = rng.standard_normal(pipeline.encoder.embedding_dim).astype(np.float32)
+        templates.append(IrisTemplate(person_id=person.id, embedding=emb.tobytes(), quality_score=1.0))
+    session.add_all(templates)
+    session.commit()
+
+
+def run_scenario(cfg, pipeline, name, width, height, faces, args, tmp):
+    video = str(Path(tmp) / f"{name}.mp4")
+    write_eye_video(video, args.frames, width, height, faces=faces, seed=args.seed)
+    times = StageTimes()
+
+    # decode on the calling thread so only decoding is measured
+    reader = VideoReader(frame_skip=args.frame_skip, prefetch=0)
+    frames = []
+    it = iter(reader.iter_frames(video))
+    while True:
+        start = time.perf_counter()
+        item = next(it, None)
+        if item is None:
+            break
+        times.add("decode", time.perf_counter() - start)
+        frames.append(item)
+
+    url = f"sqlite:///{Path(tmp) / (name + '.db')}"
+    init_db(url)
+    session = get_session_from_url(url)()
+    rng = np.random.default_rng(args.seed)
+    seed_gallery(session, pipeline, frames[0][1], args.gallery_size, rng)
+    gallery = TemplateGallery()
+    gallery.refresh(session)
+    _, person_ids, embeddings, _ = gallery.snapshot()
+    matcher = IrisMatcher(threshold=cfg["match"]["threshold"])
+    matcher.load_gallery(person_ids, embeddings, normalized=True)
+
+    rows = []
+    eyes_total = 0
+    for frame_idx, frame in frames:
+        eyes = times.timed("detect", pipeline.detector.detect_eyes, frame)
+        eyes_total += len(eyes)
+        for eye in eyes:
+            times.timed("quality", pipeline.quality.check_crop, eye)
+            times.timed("segment", pipeline.segment_sample, eye)
+            strip = times.timed(
+                "normalize",
+                pipeline.normalizer.normalize_gray,
+                eye.gray,
+                eye.center,
+                eye.pupil_radius,
+                eye.iris_radius,
+            )
+            emb = times.timed("encode", pipeline.encoder.encode, strip)
+            person_id, score = times.timed("match", matcher.match, emb)
+            rows.append(
+                {
+                    "person_id": person_id or int(person_ids[0]),
+                    "camera_id": "BENCH",
+                    "video_path": video,
+                    "timestamp": datetime.utcnow(),
+                    "score": float(score),
+                    "frame_idx": frame_idx,
+                }
+            )
+
+    writer = EventWriter(session)
+    start = time.perf_counter()
+    writer.add(rows)
+    writer.flush()
+    session.commit()
+    times.add("db_write", time.perf_counter() - start)
+
+    service = AttendanceService(
+        pipeline,
+        session,
+        threshold=cfg["match"]["threshold"],
+        frame_skip=args.frame_skip,
+        gallery=gallery,
+        debounce_seconds=cfg.get("attendance", {}).get("debounce_seconds", 0.0),
+    )
+    METRICS.reset()
+    for _ in range(args.repeats):
+        for stage, enabled in METRICS_MODES.items():
+            METRICS.enabled = enabled
+            start = time.perf_counter()
+            events = service.process_video(video, "BENCH")
+            times.add(stage, time.perf_counter() - start)
+    METRICS.enabled = True
+    counters = METRICS.snapshot()["counters"]
+    session.close()
+    summary = times.summary()
+    elapsed = summary["process_video"]["p50_ms"] / 1e3
+    off = summary["process_video_no_metrics"]["p50_ms"] / 1e3
+
+    return {
+        "width": width,
+        "height": height,
+        "faces": faces,
+        "frames_sampled": len(frames),
+        "eyes_detected": eyes_total,
+        "events_written": events,
+        "quality_skip_rate": counters["eyes_rejected"] / max(1, counters["eyes_detected"]),
+        "process_video_fps": len(frames) / elapsed if elapsed else None,
+        "metrics_overhead_pct": (elapsed / off - 1) * 100 if off else None,
+        "stages": summary,
+    }
+
+
+def timer_cost_ns(n=200_000):
+    """Cost of one ``METRICS.timer`` block, instrumentation on and off."""
+    out = {}
+    for label, enabled in (("on", True), ("off", False)):
+        METRICS.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(n):
+            with METRICS.timer("bench"):
+                pass
+        out[label] = (time.perf_counter() - start) / n * 1e9
+    METRICS.enabled = True
+    METRICS.reset()
+    return out
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline, tolerance):
+    """Return ``[(scenario, stage, old_ms, new_ms)]`` for stages slower than tolerance.
+
+    Medians are compared rather than means so a single slow outlier does
+    not trip the check.
+    """
+    regressions = []
+    for scenario, data in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if old is None:
+            continue
+        for stage, stats in data["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if old_stats is None:
+                continue
+            if stats["p50_ms"] > old_stats["p50_ms"] * (1 + tolerance):
+                regressions.append((scenario, stage, old_stats["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the iris pipeline benchmark suite.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--frame-skip", type=int, default=5)
+    parser.add_argument("--gallery-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=2,
+                        help="process_video runs per instrumentation setting.")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative slowdown per stage before it is flagged.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    cfg["device"] = "cpu"
+    torch.manual_seed(args.seed)
+    pipeline = IrisPipeline(cfg)
+
+    results = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "torch_threads": torch.get_num_threads(),
+            "args": vars(args),
+            "metrics_timer_ns": timer_cost_ns(),
+        },
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for res in args.resolutions:
+            width, height = RESOLUTIONS[res]
+            for faces in args.faces:
+                name = f"{res}_{faces}face"
+                print(f"running {name} ...", flush=True)
+                data = run_scenario(cfg, pipeline, name, width, height, faces, args, tmp)
+                results["scenarios"][name] = data
+                line = "  ".join(
+                    f"{stage}={data['stages'][stage]['p50_ms']:.2f}ms"
+                    for stage in STAGES
+                    if stage in data["stages"]
+                )
+                print(f"  eyes={data['eyes_detected']} events={data['events_written']} "
+                      f"fps={data['process_video_fps']:.1f} "
+                      f"metrics_overhead={data['metrics_overhead_pct']:+.1f}% "
+                      f"quality_skip={data['quality_skip_rate']:.0%}  {line}")
+
+    timer_ns = results["meta"]["metrics_timer_ns"]
+    print(f"metrics timer cost: {timer_ns['on']:.0f} ns on, {timer_ns['off']:.0f} ns off")
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for scenario, stage, old_ms, new_ms in regressions:
+            print(f"REGRESSION {scenario}/{stage}: {old_ms:.2f}ms -> {new_ms:.2f}ms "
+                  f"(+{(new_ms / old_ms - 1) * 100:.0f}%)")
+        if not regressions:
+            print(f"no stage slower than baseline by more than {args.tolerance:.0%}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
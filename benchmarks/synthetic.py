@@ -0,0 +1,105 @@
+"""Deterministic synthetic videos for benchmarks (no downloads needed)."""
+import cv2
+import numpy as np
+
+
+def render_background(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (height // 8 + 1, width // 8 + 1), dtype=np.uint8)
+    base = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.cvtColor(base, cv2.COLOR_GRAY2BGR)
+
+
+def write_synthetic_video(path, n_frames=300, width=1280, height=720, fps=25.0, seed=0):
+    """Write a textured background with a moving block; returns ``path``."""
+    background = render_background(width, height, seed)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    try:
+        block = max(8, min(width, height) // 8)
+        for i in range(n_frames):
+            frame = background.copy()
+            x = (i * 7) % max(1, width - block)
+            y = (i * 3) % max(1, height - block)
+            cv2.rectangle(frame, (x, y), (x + block, y + block), (30, 60, 200), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def draw_eye(img, cx, cy, size, pattern_seed=0):
+    """Draw a cartoon eye the Haar eye cascade fires on.
+
+    ``size`` is roughly the iris diameter in pixels; ``pattern_seed`` picks
+    the iris texture so different "people" have different irises.
+    """
+    rng = np.random.default_rng(pattern_seed)
+    s = max(4, size // 2)
+    axes = (int(1.6 * s), int(0.8 * s))
+    cv2.ellipse(img, (cx, cy), axes, 0, 0, 360, (235, 235, 240), -1)
+    r = int(0.75 * s)
+    base = tuple(int(v) for v in rng.integers(40, 140, size=3))
+    cv2.circle(img, (cx, cy), r, base, -1)
+    for angle in np.sort(rng.random(24)) * 2 * np.pi:
+        end = (int(cx + r * np.cos(angle)), int(cy + r * np.sin(angle)))
+        cv2.line(img, (cx, cy), end, tuple(max(0, c - 40) for c in base), 1)
+    cv2.circle(img, (cx, cy), int(0.3 * s), (15, 15, 15), -1)
+    cv2.ellipse(img, (cx, cy), axes, 0, 180, 360, (40, 40, 60), max(1, s // 6))
+    cv2.ellipse(img, (cx, cy - int(1.3 * s)), (int(1.8 * s), int(0.5 * s)), 0, 200, 340,
+                (40, 40, 50), max(2, s // 4))
+    return (cx - axes[0], cy - axes[0], cx + axes[0], cy + axes[0])
+
+
+def draw_face(img, cx, cy, eye_size, person=0):
+    """Two eyes side by side; returns their approximate bounding boxes."""
+    gap = int(2.5 * eye_size)
+    return [
+        draw_eye(img, cx - gap // 2, cy, eye_size, pattern_seed=2 * person),
+        draw_eye(img, cx + gap // 2, cy, eye_size, pattern_seed=2 * person + 1),
+    ]
+
+
+def write_eye_video(path, n_frames=100, width=1280, height=720, faces=1, eye_size=None,
+                    fps=25.0, seed=0, visible=None):
+    """Write a clip of ``faces`` slowly drifting faces on a skin-toned background.
+
+    ``visible`` optionally maps face index -> ``(first_frame, last_frame)``
+    so faces can enter and leave. Returns per-frame ground truth: a list of
+    ``[(person, [eye_bbox, eye_bbox]), ...]`` for each frame.
+    """
+    rng = np.random.default_rng(seed)
+    eye_size = eye_size or max(12, min(width, height) // 24)
+    background = np.full((height, width, 3), (150, 170, 200), dtype=np.uint8)
+    noise = rng.integers(-8, 9, background.shape, dtype=np.int16)
+    background = np.clip(background.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    cols = max(1, int(np.ceil(np.sqrt(faces))))
+    rows = int(np.ceil(faces / cols))
+    anchors = [
+        (int((i % cols + 0.5) * width / cols), int((i // cols + 0.5) * height / rows))
+        for i in range(faces)
+    ]
+    phases = rng.random(faces) * 2 * np.pi
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    truth = []
+    try:
+        for i in range(n_frames):
+            frame = background.copy()
+            present = []
+            for face, (ax, ay) in enumerate(anchors):
+                first, last = (visible or {}).get(face, (0, n_frames - 1))
+                if not first <= i <= last:
+                    continue
+                dx = int(eye_size * np.sin(0.05 * i + phases[face]))
+                dy = int(0.5 * eye_size * np.cos(0.03 * i + phases[face]))
+                present.append((face, draw_face(frame, ax + dx, ay + dy, eye_size, person=face)))
+            writer.write(cv2.GaussianBlur(frame, (3, 3), 0))
+            truth.append(present)
+    finally:
+        writer.release()
+    return truth
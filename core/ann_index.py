@@ -0,0 +1,199 @@
+import copy
+
+import numpy as np
+
+class IVFIndex:
+    """Inverted-file (IVF) approximate search over a normalized gallery.
+
+    ``build`` clusters the gallery with spherical k-means into ``nlist``
+    partitions and files every row under its nearest centroid. A query
+    only scores the rows in its ``nprobe`` nearest partitions, so the cost
+    per query drops from N to about ``N * nprobe / nlist`` dot products;
+    the best match is missed only when it was filed under a partition that
+    wasn't probed.
+
+    Each partition keeps its row numbers and a contiguous copy of its
+    vectors (IVF-flat), so the index costs about as much memory as the
+    gallery itself, and a batch of queries scores each probed partition
+    with one matrix product instead of gathering rows. ``build`` and
+    ``add`` return a new index and never modify the one they're called on,
+    so readers holding an older gallery + index pair stay consistent.
+
+    nlist: partitions; None picks ``sqrt(N)``.
+    nprobe: partitions scanned per query.
+    target_recall: if set, ``build`` picks the smallest ``nprobe`` whose
+        top-1 agreement with exact search reaches it, measured on synthetic
+        queries at ``calibration_similarity`` to a random gallery row (a
+        genuine match at the match threshold; stronger matches do better).
+    min_gallery: below this many rows ``build`` returns None and callers
+        search exactly.
+    """
+
+    def __init__(
+        self,
+        nlist: int = None,
+        nprobe: int = 16,
+        target_recall: float = None,
+        min_gallery: int = 20000,
+        train_iters: int = 10,
+        train_per_list: int = 64,
+        calibration_similarity: float = 0.7,
+        calibration_queries: int = 256,
+        seed: int = 0,
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.target_recall = target_recall
+        self.min_gallery = min_gallery
+        self.train_iters = train_iters
+        self.train_per_list = train_per_list
+        self.calibration_similarity = calibration_similarity
+        self.calibration_queries = calibration_queries
+        self.seed = seed
+        self.centroids = None
+        self.lists = None
+        self.vectors = None
+        self.trained_size = 0
+
+    @classmethod
+    def from_config(cls, options: dict = None):
+        """Index from the ``match.ann`` config section; None unless ``enabled``."""
+        options = dict(options or {})
+        if not options.pop("enabled", False):
+            return None
+        return cls(**options)
+
+    def __len__(self):
+        return 0 if self.lists is None else sum(len(rows) for rows in self.lists)
+
+    def build(self, gallery):
+        """Index every row of ``gallery`` ([N, D] unit rows); None if N < ``min_gallery``.
+
+        Centroids are reused when this index is already trained on the
+        same dimension and N is within a factor of two of the size it was
+        trained at; otherwise k-means runs again on a sample.
+        """
+        n = len(gallery)
+        if n == 0 or n < self.min_gallery:
+            return None
+        index = copy.copy(self)
+        rng = np.random.default_rng(self.seed)
+        if (
+            self.centroids is None
+            or self.centroids.shape[1] != gallery.shape[1]
+            or not self.trained_size / 2 <= n <= self.trained_size * 2
+        ):
+            index.centroids = index._train(gallery, rng)
+            index.trained_size = n
+        assign = index._assign(gallery)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=len(index.centroids))
+        index.lists = np.split(order.astype(np.int64), np.cumsum(counts)[:-1])
+        index.vectors = [np.ascontiguousarray(gallery[rows]) for rows in index.lists]
+        if self.target_recall is not None:
+            index.nprobe = index._calibrate(gallery, assign, rng)
+        return index
+
+    def add(self, gallery, start: int):
+        """Index rows ``gallery[start:]`` appended since the last build/add.
+
+        Only the new rows are assigned to partitions. Once the gallery has
+        doubled since training the whole index is rebuilt instead.
+        """
+        if len(gallery) > self.trained_size * 2:
+            return self.build(gallery)
+        index = copy.copy(self)
+        index.lists = list(self.lists)
+        index.vectors = list(self.vectors)
+        if len(gallery) <= start:
+            return index
+        assign = self._assign(gallery[start:])
+        for c in np.unique(assign):
+            rows = np.flatnonzero(assign == c) + start
+            index.lists[c] = np.concatenate([self.lists[c], rows])
+            index.vectors[c] = np.concatenate([self.vectors[c], gallery[rows]])
+        return index
+
+    def probe(self, queries, nprobe: int = None) -> np.ndarray:
+        """Partitions to scan per query, ``[Q, nprobe]`` (unordered)."""
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        sims = queries @ self.centroids.T
+        if nprobe == len(self.centroids):
+            return np.broadcast_to(np.arange(nprobe), sims.shape)
+        return np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe]
+
+    def candidates(self, queries, nprobe: int = None):
+        """Per query, ``(rows, scores)`` of every row in its probed partitions.
+
+        ``queries`` must be L2-normalized; scores are exact cosines.
+        """
+        probes = self.probe(queries, nprobe)
+        flat = probes.ravel()
+        owners = np.repeat(np.arange(len(queries)), probes.shape[1])
+        order = np.argsort(flat, kind="stable")
+        flat, owners = flat[order], owners[order]
+        lists, starts = np.unique(flat, return_index=True)
+        rows = [[] for _ in range(len(queries))]
+        scores = [[] for _ in range(len(queries))]
+        # one product per probed partition, shared by every query probing it
+        for c, qs in zip(lists, np.split(owners, starts[1:])):
+            if len(self.lists[c]) == 0:
+                continue
+            block = queries[qs] @ self.vectors[c].T
+            for q, s in zip(qs, block):
+                rows[q].append(self.lists[c])
+                scores[q].append(s)
+        empty_rows = np.empty(0, dtype=np.int64)
+        empty_scores = np.empty(0, dtype=np.float32)
+        return [
+            (np.concatenate(r) if r else empty_rows, np.concatenate(s) if s else empty_scores)
+            for r, s in zip(rows, scores)
+        ]
+
+    def _assign(self, embs, chunk: int = 65536) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(embs[i:i + chunk] @ self.centroids.T, axis=1)
+            for i in range(0, len(embs), chunk)
+        ])
+
+    def _train(self, gallery, rng) -> np.ndarray:
+        n = len(gallery)
+        nlist = min(self.nlist or max(1, int(round(np.sqrt(n)))), n)
+        sample_size = min(n, nlist * self.train_per_list)
+        sample = np.asarray(gallery[np.sort(rng.choice(n, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.train_iters):
+            self.centroids = centroids
+            assign = self._assign(sample)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=nlist)
+            filled = counts > 0
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            centroids = centroids.copy()
+            centroids[filled] = sums
+            # reseed empty partitions from random sample rows
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-8
+        return centroids.astype(np.float32)
+
+    def _calibrate(self, gallery, assign, rng) -> int:
+        """Smallest nprobe reaching ``target_recall`` on synthetic genuine queries."""
+        n = min(self.calibration_queries, len(gallery))
+        rows = rng.choice(len(gallery), n, replace=False)
+        base = np.asarray(gallery[rows])
+        noise = rng.standard_normal(base.shape).astype(np.float32)
+        noise -= np.sum(noise * base, axis=1, keepdims=True) * base
+        noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+        t = self.calibration_similarity
+        queries = t * base + np.sqrt(1.0 - t * t) * noise
+        best = np.concatenate([
+            np.argmax(queries[i:i + 32] @ gallery.T, axis=1) for i in range(0, n, 32)
+        ])
+        # rank of the partition holding the exact best row in each query's probe order
+        probe_order = np.argsort(-(queries @ self.centroids.T), axis=1)
+        ranks = np.argmax(probe_order == assign[best][:, None], axis=1)
+        needed = int(np.ceil(self.target_recall * n)) - 1
+        return int(np.sort(ranks)[min(max(needed, 0), n - 1)]) + 1
@@ -1,7 +1,27 @@
+import copy
+import os
+import warnings
+
 import numpy as np
 import torch
 import torch.nn as nn
 
+BACKENDS = ("eager", "torchscript", "onnx", "int8")
+
+def set_torch_threads(intra_op: int = None, inter_op: int = None):
+    """Size torch's process-wide intra-op / inter-op thread pools.
+
+    ``None`` keeps the library default. The inter-op pool can only be
+    sized before torch first uses it, so later requests are ignored.
+    """
+    if intra_op:
+        torch.set_num_threads(int(intra_op))
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(int(inter_op))
+        except RuntimeError:
+            pass  # pool already started; keep its current size
+
 class SimpleIrisEncoderNet(nn.Module):
     """Lightweight CNN encoder.
 
@@ -37,8 +57,35 @@ class SimpleIrisEncoderNet(nn.Module):
         return x
 
 class IrisEncoder:
-    def __init__(self, model_path: str = None, device: str = "cuda", embedding_dim: int = 256):
+    """Embeds normalized iris strips with one of several inference backends.
+
+    eager: the PyTorch module as is.
+    torchscript: traced and frozen per strip shape on first use.
+    onnx: an exported graph (``export_onnx``) run by onnxruntime; needs
+        ``onnx_path`` to exist and onnxruntime to be installed.
+    int8: dynamic int8 quantization of the Linear layers (the conv layers
+        stay fp32, dynamic quantization does not cover them); CPU only.
+    All backends share the weights loaded from ``model_path``.
+    """
+
+    def __init__(
+        self,
+        model_path: str = None,
+        device: str = "cpu",
+        embedding_dim: int = 256,
+        backend: str = "eager",
+        onnx_path: str = None,
+        intra_op_threads: int = None,
+        inter_op_threads: int = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown encoder backend {backend!r}; expected one of {BACKENDS}")
+        set_torch_threads(intra_op_threads, inter_op_threads)
         self.device = torch.device(device if torch.cuda.is_available() else "cpu")
+        if backend in ("onnx", "int8"):
+            self.device = torch.device("cpu")
+        self.embedding_dim = embedding_dim
+        self.backend = backend
         self.model = SimpleIrisEncoderNet(embedding_dim=embedding_dim).to(self.device)
         if model_path is not None and model_path.strip() != "":
             try:
@@ -48,12 +95,86 @@ class IrisEncoder:
                 # run with random weights if file missing
                 pass
         self.model.eval()
+        self._traced = {}
+        self._session = None
+        if backend == "int8":
+            self._quantized = torch.ao.quantization.quantize_dynamic(
+                copy.deepcopy(self.model), {nn.Linear}, dtype=torch.qint8
+            )
+        elif backend == "onnx":
+            self._session = self._onnx_session(onnx_path, intra_op_threads, inter_op_threads)
+
+    @staticmethod
+    def _onnx_session(onnx_path, intra_op_threads, inter_op_threads):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise RuntimeError("encoder backend 'onnx' requires the onnxruntime package") from exc
+        if not onnx_path or not os.path.exists(onnx_path):
+            raise RuntimeError(
+                f"ONNX encoder graph not found at {onnx_path!r}; "
+                "create it with scripts/export_encoder.py"
+            )
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        if inter_op_threads:
+            options.inter_op_num_threads = int(inter_op_threads)
+        return ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def export_onnx(self, path: str, strip_shape):
+        """Write the eager model as an ONNX graph with a dynamic batch axis.
+
+        strip_shape: ``(radial_res, angular_res)`` of the normalized strips.
+        """
+        example = torch.zeros((1, 1, *strip_shape), dtype=torch.float32, device=self.device)
+        torch.onnx.export(
+            self.model,
+            example,
+            path,
+            input_names=["strips"],
+            output_names=["embeddings"],
+            dynamic_axes={"strips": {0: "batch"}, "embeddings": {0: "batch"}},
+        )
+
+    def _torchscript(self, x):
+        key = tuple(x.shape[2:])
+        module = self._traced.get(key)
+        if module is None:
+            with torch.no_grad(), warnings.catch_warnings():
+                # torch.jit is deprecated upstream but still the lightest CPU path
+                warnings.simplefilter("ignore", FutureWarning)
+                traced = torch.jit.trace(self.model, x[:1])
+                module = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+            self._traced[key] = module
+        return module(x)
+
+    def _forward(self, arr):
+        """[N, 1, H, W] float32 array -> [N, embedding_dim] array."""
+        if self.backend == "onnx":
+            return self._session.run(None, {"strips": arr})[0]
+        x = torch.from_numpy(arr).to(self.device)
+        with torch.inference_mode():
+            if self.backend == "torchscript":
+                emb = self._torchscript(x)
+            elif self.backend == "int8":
+                emb = self._quantized(x)
+            else:
+                emb = self.model(x)
+            return emb.cpu().numpy()
 
     def encode(self, norm_iris):
         """norm_iris: np.ndarray [H, W], float32 in [0,1]"""
-        arr = norm_iris.astype(np.float32)
-        arr = np.expand_dims(arr, axis=(0, 1))  # [1,1,H,W]
-        x = torch.from_numpy(arr).to(self.device)
-        with torch.no_grad():
-            emb = self.model(x).cpu().numpy()[0]
-        return emb.astype(np.float32)
+        return self.encode_batch(np.expand_dims(norm_iris, axis=0))[0]
+
+    def encode_batch(self, norm_irises):
+        """Encode several strips in one forward pass.
+
+        norm_irises: list of [H, W] arrays or an [N, H, W] stack, float32 in [0,1]
+        Returns: np.ndarray [N, embedding_dim] float32.
+        """
+        if len(norm_irises) == 0:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        arr = np.ascontiguousarray(norm_irises, dtype=np.float32)
+        arr = np.expand_dims(arr, axis=1)  # [N,1,H,W]
+        return self._forward(arr).astype(np.float32, copy=False)
@@ -0,0 +1,30 @@
+class EyeSample:
+    """One detected eye as it moves through the pipeline.
+
+    gray: uint8 view into the grayscale frame (not a copy); valid as long
+        as the sample is alive.
+    bbox: ``(x0, y0, x1, y1)`` in full-resolution frame coordinates.
+    confidence: detector score.
+    center / pupil_radius / iris_radius: iris geometry in ``gray``
+        coordinates, filled in by ``IrisSegmenter.locate``.
+    segmented: whether the segmenter actually found an iris; when False
+        the geometry is the centred fallback guess.
+    quality: [0, 1] usability score from ``QualityGate`` (None until scored).
+    """
+
+    __slots__ = (
+        "gray", "bbox", "confidence", "center", "pupil_radius", "iris_radius", "segmented", "quality",
+    )
+
+    def __init__(self, gray, bbox, confidence: float = 1.0):
+        self.gray = gray
+        self.bbox = bbox
+        self.confidence = confidence
+        self.center = None
+        self.pupil_radius = None
+        self.iris_radius = None
+        self.segmented = False
+        self.quality = None
+
+    def __repr__(self):
+        return f"EyeSample(bbox={self.bbox}, segmented={self.segmented})"
@@ -0,0 +1,92 @@
+import threading
+
+class EyeTracker:
+    """Stateful eye detection for one video or stream.
+
+    After a full-frame scan the detector only searches padded regions
+    around the previous eye boxes. A full scan runs again every
+    ``full_scan_interval`` frames (to pick up new faces) and immediately
+    whenever a tracked eye is not found inside its region. Create one
+    tracker per source; frames should arrive roughly in order.
+
+    ``last_pixels_scanned`` / ``pixels_scanned`` / ``full_scans`` /
+    ``frames`` report how much of the image the cascade actually searched.
+    """
+
+    def __init__(self, detector, padding: float = 0.5, full_scan_interval: int = 10):
+        self.detector = detector
+        self.padding = padding
+        self.full_scan_interval = max(1, int(full_scan_interval))
+        self.frames = 0
+        self.full_scans = 0
+        self.pixels_scanned = 0
+        self.last_pixels_scanned = 0
+        self._boxes = []
+        self._since_full = 0
+        # the staged pipeline calls in from its detection thread
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._boxes = []
+            self._since_full = 0
+
+    def _regions(self, width, height):
+        """Padded search regions around the tracked boxes, overlaps merged."""
+        regions = []
+        for x0, y0, x1, y1 in self._boxes:
+            pad_x = int((x1 - x0) * self.padding)
+            pad_y = int((y1 - y0) * self.padding)
+            regions.append(
+                [max(0, x0 - pad_x), max(0, y0 - pad_y), min(width, x1 + pad_x), min(height, y1 + pad_y)]
+            )
+        merged = []
+        for region in sorted(regions):
+            for other in merged:
+                if (region[0] < other[2] and other[0] < region[2]
+                        and region[1] < other[3] and other[1] < region[3]):
+                    other[0] = min(other[0], region[0])
+                    other[1] = min(other[1], region[1])
+                    other[2] = max(other[2], region[2])
+                    other[3] = max(other[3], region[3])
+                    break
+            else:
+                merged.append(region)
+        return [tuple(r) for r in merged]
+
+    def _tracked(self, results):
+        """True if every previous box has a detection centred near it."""
+        centers = [((b[0] + b[2]) / 2, (b[1] + b[3]) / 2) for b in (r.bbox for r in results)]
+        for x0, y0, x1, y1 in self._boxes:
+            pad_x = (x1 - x0) * self.padding
+            pad_y = (y1 - y0) * self.padding
+            if not any(x0 - pad_x <= cx <= x1 + pad_x and y0 - pad_y <= cy <= y1 + pad_y
+                       for cx, cy in centers):
+                return False
+        return True
+
+    def detect_eyes(self, frame_bgr):
+        """Same contract as ``IrisDetector.detect_eyes``."""
+        h, w = frame_bgr.shape[:2]
+        with self._lock:
+            self.frames += 1
+            scanned = 0
+            results = None
+            if self._boxes and self._since_full < self.full_scan_interval:
+                results = []
+                for region in self._regions(w, h):
+                    results.extend(self.detector.detect_eyes(frame_bgr, region=region))
+                    scanned += (region[2] - region[0]) * (region[3] - region[1])
+                if self._tracked(results):
+                    self._since_full += 1
+                else:
+                    results = None  # lost a track: fall back to a full scan
+            if results is None:
+                results = self.detector.detect_eyes(frame_bgr)
+                scanned += w * h
+                self.full_scans += 1
+                self._since_full = 1
+            self._boxes = [r.bbox for r in results]
+            self.last_pixels_scanned = scanned
+            self.pixels_scanned += scanned
+        return results
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+class SnapshotWriter:
+    """Write a gallery snapshot into ``directory`` without loading it all at once.
+
+    Arrays are ``.npy`` files (template ids, person ids, L2-normalized
+    float32 embeddings), sized up front and filled chunk by chunk through
+    memmaps. ``commit`` writes ``manifest.json`` last with an atomic
+    replace, so readers see either the old snapshot or the new one; files
+    of the previous snapshot are removed afterwards.
+    """
+
+    def __init__(self, directory, count: int, embedding_dim: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # the random suffix keeps two exports in the same second apart
+        self.tag = f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.count = count
+        self.embedding_dim = embedding_dim
+        self.files = {
+            "template_ids": f"template_ids-{self.tag}.npy",
+            "person_ids": f"person_ids-{self.tag}.npy",
+            "embeddings": f"embeddings-{self.tag}.npy",
+        }
+        open_memmap = np.lib.format.open_memmap
+        self.template_ids = open_memmap(
+            self.directory / self.files["template_ids"], mode="w+", dtype=np.int64, shape=(count,)
+        )
+        self.person_ids = open_memmap(
+            self.directory / self.files["person_ids"], mode="w+", dtype=np.int64, shape=(count,)
+        )
+        self.embeddings = open_memmap(
+            self.directory / self.files["embeddings"],
+            mode="w+",
+            dtype=np.float32,
+            shape=(count, embedding_dim),
+        )
+        self.written = 0
+
+    def write(self, template_ids, person_ids, embeddings):
+        end = self.written + len(template_ids)
+        self.template_ids[self.written:end] = template_ids
+        self.person_ids[self.written:end] = person_ids
+        self.embeddings[self.written:end] = embeddings
+        self.written = end
+
+    def commit(self, **manifest):
+        if self.written != self.count:
+            raise RuntimeError(f"Snapshot expected {self.count} rows, got {self.written}")
+        for arr in (self.template_ids, self.person_ids, self.embeddings):
+            arr.flush()
+        previous = read_manifest(self.directory)
+        manifest = dict(
+            manifest,
+            format=FORMAT_VERSION,
+            count=self.count,
+            embedding_dim=self.embedding_dim,
+            created_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            files=self.files,
+        )
+        tmp = self.directory / f"{MANIFEST}.{self.tag}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.directory / MANIFEST)
+        if previous is not None:
+            for name in previous.get("files", {}).values():
+                if name not in self.files.values():
+                    try:
+                        (self.directory / name).unlink()
+                    except FileNotFoundError:
+                        pass
+        return manifest
+
+def read_manifest(directory):
+    """The snapshot manifest in ``directory``, or None if there is none."""
+    path = Path(directory) / MANIFEST
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+def open_snapshot(directory):
+    """Memory-map a snapshot read-only.
+
+    Returns ``(manifest, template_ids, person_ids, embeddings)`` or None if
+    ``directory`` holds no snapshot. Rows are ordered by person id, so
+    ``IrisMatcher.load_gallery(..., normalized=True)`` uses the mapped
+    embeddings directly instead of copying them.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get("format") != FORMAT_VERSION:
+        return None
+    directory = Path(directory)
+    files = manifest["files"]
+    arrays = [
+        np.load(directory / files[key], mmap_mode="r")
+        for key in ("template_ids", "person_ids", "embeddings")
+    ]
+    if any(len(arr) != manifest["count"] for arr in arrays):
+        raise RuntimeError(f"Gallery snapshot in {directory} is inconsistent with its manifest")
+    return (manifest, *arrays)
@@ -1,6 +1,10 @@
+import threading
+
 import cv2
 
 from .asset_manager import ensure_eye_cascade
+from .eye_sample import EyeSample
+from .metrics import METRICS
 
 class IrisDetector:
     """IrisDetector wrapper.
@@ -10,29 +14,77 @@ class IrisDetector:
     with a proper IriTrack-based eye/iris localization model.
     """
 
-    def __init__(self, cascade_path: str, min_size_ratio: float = 0.05):
+    def __init__(self, cascade_path: str, min_size_ratio: float = 0.05, scale: float = 1.0):
         cascade_file = ensure_eye_cascade(cascade_path)
-        self.cascade = cv2.CascadeClassifier(str(cascade_file))
+        self.cascade_path = str(cascade_file)
         self.min_size_ratio = min_size_ratio
+        self.scale = scale
+        # CascadeClassifier is not safe to share between threads, so the
+        # staged pipeline's workers each get their own instance
+        self._local = threading.local()
+        self._local.cascade = cv2.CascadeClassifier(self.cascade_path)
+
+    @property
+    def cascade(self):
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(self.cascade_path)
+            self._local.cascade = cascade
+        return cascade
+
+    def detect_eyes(self, frame_bgr, region=None, scale: float = None):
+        """Run the cascade over the frame, or only over ``region``.
 
-    def detect_eyes(self, frame_bgr):
-        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-        h, w = gray.shape[:2]
-        min_size = int(min(h, w) * self.min_size_ratio)
+        Returns a list of ``EyeSample``; each one's ``gray`` is a view into
+        the single grayscale conversion made here, so no crops are copied.
+        region: optional ``(x0, y0, x1, y1)`` in frame coordinates. The
+        minimum eye size is always derived from the full frame, and boxes
+        are returned in frame coordinates either way.
+        scale: the cascade runs on the gray image resized by this factor
+        (default ``self.scale``); boxes are mapped back and crops are taken
+        from the full-resolution frame.
+        """
+        scale = self.scale if scale is None else scale
+        h, w = frame_bgr.shape[:2]
+        min_size = max(1, int(min(h, w) * self.min_size_ratio * scale))
+        x0, y0 = 0, 0
+        view = frame_bgr
+        if region is not None:
+            x0, y0, x1, y1 = region
+            view = frame_bgr[y0:y1, x0:x1]
+        gray = cv2.cvtColor(view, cv2.COLOR_BGR2GRAY)
+        small = gray
+        if scale != 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        METRICS.inc("detector_pixels_scanned", small.size)
         eyes = self.cascade.detectMultiScale(
-            gray,
+            small,
             scaleFactor=1.1,
             minNeighbors=5,
             minSize=(min_size, min_size)
         )
+        gh, gw = gray.shape[:2]
         results = []
-        for (x, y, ew, eh) in eyes:
-            eye_crop = frame_bgr[y:y+eh, x:x+ew].copy()
+        for box in eyes:
+            if scale != 1.0:
+                box = (box / scale).round().astype(int)
+            x, y, ew, eh = (int(v) for v in box)
+            rx1, ry1 = min(gw, x + ew), min(gh, y + eh)
             results.append(
-                {
-                    "eye_crop": eye_crop,
-                    "bbox": (int(x), int(y), int(x+ew), int(y+eh)),
-                    "confidence": 1.0,  # cascade has no confidence, so use 1.0
-                }
+                EyeSample(
+                    gray[y:ry1, x:rx1],
+                    (x + x0, y + y0, rx1 + x0, ry1 + y0),
+                    1.0,  # cascade has no confidence, so use 1.0
+                )
             )
         return results
+
+class ScaledDetector:
+    """An ``IrisDetector`` pinned to a detection scale (per-camera override)."""
+
+    def __init__(self, detector: IrisDetector, scale: float):
+        self.detector = detector
+        self.scale = scale
+
+    def detect_eyes(self, frame_bgr, region=None):
+        return self.detector.detect_eyes(frame_bgr, region=region, scale=self.scale)
@@ -12,9 +12,9 @@ class IrisSegmenter:
     def __init__(self):
         pass
 
-    def segment(self, eye_crop_bgr):
-        gray = cv2.cvtColor(eye_crop_bgr, cv2.COLOR_BGR2GRAY)
-        gray = cv2.medianBlur(gray, 5)
+    def locate(self, eye_gray):
+        """Iris circle ``(cx, cy, r)`` in a grayscale eye crop, or None."""
+        gray = cv2.medianBlur(eye_gray, 5)
         h, w = gray.shape[:2]
 
         # HoughCircles to guess iris region
@@ -29,11 +29,19 @@ class IrisSegmenter:
             maxRadius=min(h, w) // 2,
         )
 
+        if circles is None:
+            return None
+        circles = np.uint16(np.around(circles))
+        # take the largest circle as iris
+        c = max(circles[0, :], key=lambda x: x[2])
+        return int(c[0]), int(c[1]), int(c[2])
+
+    def segment(self, eye_crop_bgr):
+        """Binary iris mask (1 inside the circle) for a BGR eye crop."""
+        gray = cv2.cvtColor(eye_crop_bgr, cv2.COLOR_BGR2GRAY)
         mask = np.zeros_like(gray, dtype=np.uint8)
-        if circles is not None:
-            circles = np.uint16(np.around(circles))
-            # take the largest circle as iris
-            c = max(circles[0, :], key=lambda x: x[2])
-            cx, cy, r = int(c[0]), int(c[1]), int(c[2])
+        circle = self.locate(gray)
+        if circle is not None:
+            cx, cy, r = circle
             cv2.circle(mask, (cx, cy), r, 1, thickness=-1)
         return mask
@@ -3,18 +3,164 @@ import numpy as np
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8))
 
+def l2_normalize(embs) -> np.ndarray:
+    """Row-wise L2 normalization into a float32 array ([D] -> [1, D])."""
+    arr = np.atleast_2d(np.asarray(embs, dtype=np.float32))
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    return arr / (norms + 1e-8)
+
 class IrisMatcher:
+    """Cosine matcher over a gallery held as one pre-normalized matrix.
+
+    The gallery is stored as a float32 ``[N, D]`` matrix of unit-length
+    rows plus a parallel array of person ids, so scoring a batch of
+    queries is a single matrix product instead of a Python loop.
+
+    When a built ``IVFIndex`` (core.ann_index) is installed alongside the
+    gallery, ``match_batch`` and ``topk`` only score the rows in each
+    query's probed partitions. ``scores`` always stays exact.
+    """
+
     def __init__(self, threshold: float = 0.7):
         self.threshold = threshold
+        self.load_gallery(np.empty(0, dtype=np.int64), None)
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def set_gallery(self, enrolled_templates):
+        """Build the gallery from ``[{"person_id", "embedding"}, ...]``."""
+        if len(enrolled_templates) == 0:
+            return self.load_gallery(np.empty(0, dtype=np.int64), None)
+        person_ids = np.fromiter(
+            (t["person_id"] for t in enrolled_templates),
+            dtype=np.int64,
+            count=len(enrolled_templates),
+        )
+        embeddings = np.stack([t["embedding"] for t in enrolled_templates], axis=0)
+        return self.load_gallery(person_ids, embeddings)
+
+    def load_gallery(self, person_ids, embeddings, normalized: bool = False, index=None):
+        """Install a gallery from parallel id / embedding arrays.
+
+        ``index`` is an ``IVFIndex`` built over these exact rows (in this
+        order), or None for exact search.
+        """
+        person_ids = np.asarray(person_ids, dtype=np.int64)
+        self.index = None
+        if len(person_ids) == 0:
+            self.person_ids = person_ids
+            self.gallery = np.empty((0, 0), dtype=np.float32)
+            self._persons = person_ids
+            self._person_starts = None
+            return self
+        gallery = (
+            np.asarray(embeddings, dtype=np.float32) if normalized else l2_normalize(embeddings)
+        )
+        if index is not None:
+            # index rows refer to this order, so keep it as is
+            self.person_ids = person_ids
+            self.gallery = gallery
+            self.index = index
+            return self
+        # keep each person's templates contiguous so per-person maxima are
+        # a single reduceat over the score matrix
+        if np.any(person_ids[1:] < person_ids[:-1]):
+            order = np.argsort(person_ids, kind="stable")
+            person_ids = person_ids[order]
+            gallery = gallery[order]
+        persons, starts = np.unique(person_ids, return_index=True)
+        self.person_ids = person_ids
+        self.gallery = gallery
+        self._persons = persons
+        self._person_starts = None if len(persons) == len(person_ids) else starts
+        return self
+
+    def scores(self, query_embs) -> np.ndarray:
+        """Cosine scores ``[Q, N]`` of queries against the whole gallery."""
+        queries = l2_normalize(query_embs)
+        if len(self.person_ids) == 0:
+            return np.empty((queries.shape[0], 0), dtype=np.float32)
+        return queries @ self.gallery.T
+
+    def topk(self, query_embs, k: int = 5):
+        """Top-k ``(person_id, score)`` candidates per query, best first.
+
+        A person with several templates is listed once, with the score of
+        their best-matching template.
+        """
+        if self.index is not None:
+            return [
+                self._topk_candidates(rows, scores, k)
+                for rows, scores in self.index.candidates(l2_normalize(query_embs))
+            ]
+        scores = self.scores(query_embs)
+        if scores.shape[1] == 0:
+            return [[] for _ in range(scores.shape[0])]
+        if self._person_starts is not None:
+            scores = np.maximum.reduceat(scores, self._person_starts, axis=1)
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            idx = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        top = np.take_along_axis(scores, idx, axis=1)
+        order = np.argsort(-top, axis=1, kind="stable")
+        idx = np.take_along_axis(idx, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return [
+            [(int(self._persons[i]), float(s)) for i, s in zip(row_idx, row_scores)]
+            for row_idx, row_scores in zip(idx, top)
+        ]
+
+    def _topk_candidates(self, rows, scores, k):
+        # sort only a shortlist; widen to everything if it holds fewer than k people
+        shortlist = min(len(scores), 8 * k)
+        if shortlist < len(scores):
+            order = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            order = order[np.argsort(-scores[order], kind="stable")]
+            if len(np.unique(self.person_ids[rows[order]])) < k:
+                order = np.argsort(-scores, kind="stable")
+        else:
+            order = np.argsort(-scores, kind="stable")
+        persons = self.person_ids[rows[order]]
+        # first occurrence of each person in score order is their best template
+        _, first = np.unique(persons, return_index=True)
+        best = np.sort(first)[:k]
+        return [(int(persons[i]), float(scores[order[i]])) for i in best]
+
+    def match_batch(self, query_embs):
+        """Best match per query as ``(person_id | None, score)``."""
+        if self.index is not None:
+            results = []
+            for rows, scores in self.index.candidates(l2_normalize(query_embs)):
+                if len(rows) == 0:
+                    results.append((None, -1.0))
+                    continue
+                i = int(np.argmax(scores))
+                score = float(scores[i])
+                person_id = int(self.person_ids[rows[i]]) if score >= self.threshold else None
+                results.append((person_id, score))
+            return results
+        scores = self.scores(query_embs)
+        if scores.shape[1] == 0:
+            return [(None, -1.0) for _ in range(scores.shape[0])]
+        best = np.argmax(scores, axis=1)
+        results = []
+        for q, i in enumerate(best):
+            score = float(scores[q, i])
+            if score >= self.threshold:
+                results.append((int(self.person_ids[i]), score))
+            else:
+                results.append((None, score))
+        return results
+
+    def match(self, query_emb, enrolled_templates=None):
+        """Best match for one query.
 
-    def match(self, query_emb, enrolled_templates):
-        best_score = -1.0
-        best_person = None
-        for t in enrolled_templates:
-            score = cosine_similarity(query_emb, t["embedding"])
-            if score > best_score:
-                best_score = score
-                best_person = t["person_id"]
-        if best_score >= self.threshold:
-            return best_person, best_score
-        return None, best_score
+        ``enrolled_templates`` is kept for backwards compatibility; when
+        given, it replaces the current gallery.
+        """
+        if enrolled_templates is not None:
+            self.set_gallery(enrolled_templates)
+        return self.match_batch(query_emb)[0]
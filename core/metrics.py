@@ -0,0 +1,139 @@
+import bisect
+import threading
+import time
+
+# Upper bounds in seconds; a sampled frame typically spends 0.1–100 ms per stage.
+DEFAULT_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGES = ("decode", "detect", "quality", "segment", "normalize", "encode", "match", "db_write")
+
+COUNTERS = {
+    "frames_decoded": "Sampled video frames decoded.",
+    "frames_skipped": "Decoded frames the motion sampler did not pass to the pipeline.",
+    "eyes_detected": "Eye regions returned by the detector.",
+    "detector_pixels_scanned": "Grayscale pixels the eye cascade searched.",
+    "segmentation_failures": "Eyes where segmentation found no iris or normalization failed.",
+    "eyes_rejected": "Eyes dropped by the quality gate before encoding.",
+    "matches": "Embeddings matched to an enrolled person.",
+    "events_written": "Attendance events inserted into the database.",
+}
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """Per-stage latency histograms and pipeline counters.
+
+    Everything is process-local and guarded by one lock; recording is a
+    bisect plus a few integer updates. With ``enabled = False`` every call
+    returns immediately, so instrumented code paths cost next to nothing.
+    ``render()`` produces the Prometheus text exposition format.
+    """
+
+    def __init__(self, enabled: bool = True, buckets=DEFAULT_BUCKETS_S, prefix: str = "iris"):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def configure(self, options: dict = None):
+        """Apply the ``metrics`` section of config.yaml."""
+        options = options or {}
+        self.enabled = bool(options.get("enabled", True))
+
+    def reset(self):
+        with self._lock:
+            self._stages = {stage: _Histogram(self.buckets) for stage in STAGES}
+            self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def timer(self, stage: str):
+        """Context manager recording the wall time of its block under ``stage``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram(self.buckets)
+            hist.counts[bisect.bisect_left(hist.buckets, seconds)] += 1
+            hist.total += seconds
+            hist.count += 1
+
+    def inc(self, name: str, n: int = 1):
+        if not self.enabled or not n:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        """``{"counters": {...}, "stages": {stage: {"count", "sum_s"}}}``."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "stages": {
+                    stage: {"count": h.count, "sum_s": h.total} for stage, h in self._stages.items()
+                },
+            }
+
+    def render(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds Latency of each pipeline stage.",
+            f"# TYPE {p}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, hist in self._stages.items():
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {hist.total:.9g}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {hist.count}')
+            for name, value in self._counters.items():
+                lines.append(f"# HELP {p}_{name}_total {COUNTERS.get(name, name)}")
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {value}")
+        lines.append(f"# HELP {p}_metrics_enabled Whether instrumentation is recording.")
+        lines.append(f"# TYPE {p}_metrics_enabled gauge")
+        lines.append(f"{p}_metrics_enabled {int(self.enabled)}")
+        return "\n".join(lines) + "\n"
+
+# Shared by the pipeline, readers and services of this process.
+METRICS = Metrics()
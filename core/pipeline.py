@@ -1,43 +1,247 @@
-from .iris_detector import IrisDetector
+import time
+
+import cv2
+
+from .iris_detector import IrisDetector, ScaledDetector
 from .iris_segmenter import IrisSegmenter
 from .normalization import DaugmanNormalizer
 from .encoder import IrisEncoder
+from .eye_sample import EyeSample
+from .eye_tracker import EyeTracker
+from .metrics import METRICS
+from .quality import QualityGate
+from .staged_pipeline import run_staged
 
 class IrisPipeline:
     def __init__(self, cfg):
-        self.detector = IrisDetector(cfg["models"]["iritrack_cascade"])
+        detector_cfg = cfg.get("detector", {})
+        self.detector = IrisDetector(
+            cfg["models"]["iritrack_cascade"],
+            scale=detector_cfg.get("scale", 1.0),
+        )
         self.segmenter = IrisSegmenter()
         self.normalizer = DaugmanNormalizer(
             radial_res=cfg["norm"]["radial_res"],
             angular_res=cfg["norm"]["angular_res"],
         )
+        encoder_cfg = cfg.get("encoder", {})
         self.encoder = IrisEncoder(
             cfg["models"].get("deepirisnet2", None),
-            device=cfg.get("device", "cuda"),
+            device=cfg.get("device", "cpu"),
+            backend=encoder_cfg.get("backend", "eager"),
+            onnx_path=encoder_cfg.get("onnx_path"),
+            intra_op_threads=encoder_cfg.get("intra_op_threads"),
+            inter_op_threads=encoder_cfg.get("inter_op_threads"),
         )
+        self.cameras = cfg.get("cameras") or {}
+        self.detector_mode = detector_cfg.get("mode", "full")
+        self.track_padding = detector_cfg.get("padding", 0.5)
+        self.full_scan_interval = detector_cfg.get("full_scan_interval", 10)
+        pipeline_cfg = cfg.get("pipeline", {})
+        self.batch_size = pipeline_cfg.get("batch_size", 1)
+        self.batch_timeout_ms = pipeline_cfg.get("batch_timeout_ms", None)
+        self.mode = pipeline_cfg.get("mode", "sequential")
+        self.prepare_workers = pipeline_cfg.get("prepare_workers", 2)
+        self.encode_workers = pipeline_cfg.get("encode_workers", 1)
+        self.queue_size = pipeline_cfg.get("queue_size", 8)
+        self.quality = QualityGate.from_config(cfg.get("quality"))
+        METRICS.configure(cfg.get("metrics"))
 
-    def process_eye(self, eye_crop):
-        mask = self.segmenter.segment(eye_crop)
-        pupil_center, pupil_radius, iris_radius = self.normalizer.estimate_geometry_from_mask(mask)
-        norm_iris = self.normalizer.normalize(
-            eye_crop, mask, pupil_center, pupil_radius, iris_radius
+    def segment_sample(self, sample: EyeSample):
+        """Fill in the sample's iris geometry from the segmenter."""
+        with METRICS.timer("segment"):
+            circle = self.segmenter.locate(sample.gray)
+        sample.segmented = circle is not None
+        sample.center, sample.pupil_radius, sample.iris_radius = (
+            self.normalizer.geometry_from_circle(circle, sample.gray.shape)
         )
-        emb = self.encoder.encode(norm_iris)
-        return emb
+        if not sample.segmented:
+            METRICS.inc("segmentation_failures")
+        return sample
+
+    def normalize_sample(self, sample: EyeSample):
+        self.segment_sample(sample)
+        with METRICS.timer("normalize"):
+            return self.normalizer.normalize_gray(
+                sample.gray, sample.center, sample.pupil_radius, sample.iris_radius
+            )
+
+    def prepare_sample(self, sample: EyeSample):
+        """Quality-gate, segment and normalize one eye.
+
+        Returns the normalized strip, or None when the quality gate drops
+        the eye (before segmentation if the crop alone is unusable).
+        """
+        with METRICS.timer("quality"):
+            usable = self.quality.check_crop(sample)
+        if usable:
+            self.segment_sample(sample)
+            usable = self.quality.check_segmentation(sample)
+        if not usable:
+            METRICS.inc("eyes_rejected")
+            return None
+        with METRICS.timer("normalize"):
+            return self.normalizer.normalize_gray(
+                sample.gray, sample.center, sample.pupil_radius, sample.iris_radius
+            )
+
+    def normalize_eye(self, eye_crop):
+        """Normalize a standalone BGR eye crop."""
+        gray = cv2.cvtColor(eye_crop, cv2.COLOR_BGR2GRAY)
+        return self.normalize_sample(EyeSample(gray, None))
+
+    def process_eye(self, eye_crop):
+        return self.encoder.encode(self.normalize_eye(eye_crop))
+
+    def detection_scale(self, camera_id: str = None):
+        camera = self.cameras.get(camera_id) or {}
+        return camera.get("detection_scale", self.detector.scale)
+
+    def source_detector(self, camera_id: str = None):
+        """Eye detector for one video or stream.
+
+        Applies the camera's ``detection_scale`` override and, with
+        ``detector.mode: tracking``, wraps it in a fresh ``EyeTracker``.
+        """
+        detector = self.detector
+        scale = self.detection_scale(camera_id)
+        if scale != detector.scale:
+            detector = ScaledDetector(detector, scale)
+        if self.detector_mode == "tracking":
+            detector = EyeTracker(
+                detector,
+                padding=self.track_padding,
+                full_scan_interval=self.full_scan_interval,
+            )
+        return detector
 
-    def process_frame(self, frame_bgr):
-        eyes = self.detector.detect_eyes(frame_bgr)
-        embeddings = []
+    def prepare_frame(self, frame_bgr, detector=None):
+        """Run every stage up to (not including) the encoder.
+
+        Returns a list of ``{"strip", "bbox", "confidence", "quality"}``
+        dicts, one per eye that passed the quality gate and made it through
+        segmentation and normalization.
+        ``detector`` is a per-source detector from ``source_detector``
+        (tracking state, camera scale); defaults to ``self.detector``.
+        """
+        return self.prepare_eyes(self.detect_frame(frame_bgr, detector))
+
+    def detect_frame(self, frame_bgr, detector=None):
+        """Eye detection step of ``prepare_frame``; returns the detected eyes."""
+        detector = detector if detector is not None else self.detector
+        with METRICS.timer("detect"):
+            eyes = detector.detect_eyes(frame_bgr)
+        METRICS.inc("eyes_detected", len(eyes))
+        return eyes
+
+    def prepare_eyes(self, eyes):
+        """Segment and normalize eyes from ``detect_frame`` (the rest of ``prepare_frame``)."""
+        prepared = []
         for eye in eyes:
             try:
-                emb = self.process_eye(eye["eye_crop"])
-                embeddings.append(
-                    {
-                        "embedding": emb,
-                        "bbox": eye["bbox"],
-                        "confidence": eye["confidence"],
-                    }
-                )
+                strip = self.prepare_sample(eye)
             except Exception:
+                METRICS.inc("segmentation_failures")
+                continue
+            if strip is None:
                 continue
-        return embeddings
+            prepared.append(
+                {
+                    "strip": strip,
+                    "bbox": eye.bbox,
+                    "confidence": eye.confidence,
+                    "quality": eye.quality,
+                }
+            )
+        return prepared
+
+    def encode_prepared(self, prepared):
+        """Encode strips from ``prepare_frame`` into embedding dicts."""
+        if not prepared:
+            return []
+        with METRICS.timer("encode"):
+            embs = self.encoder.encode_batch([p["strip"] for p in prepared])
+        return [
+            {
+                "embedding": emb,
+                "bbox": p["bbox"],
+                "confidence": p["confidence"],
+                "quality": p["quality"],
+            }
+            for emb, p in zip(embs, prepared)
+        ]
+
+    def process_frame(self, frame_bgr, detector=None):
+        return self.encode_prepared(self.prepare_frame(frame_bgr, detector))
+
+    def process_frames(self, frames, batch_size: int = None, batch_timeout_ms: float = None,
+                       camera_id: str = None):
+        """Batch encoder work across consecutive frames.
+
+        frames: iterable of ``(frame_idx, frame_bgr)``
+        Yields ``(frame_idx, embeddings)`` in input order, where embeddings
+        has the same shape as ``process_frame``'s result. With
+        ``pipeline.mode: staged`` the stages run on worker pools instead
+        (see ``core.staged_pipeline``); batching and results are identical.
+        Each call is treated as one source and gets its own
+        ``source_detector(camera_id)``.
+        """
+        detector = self.source_detector(camera_id)
+        if self.mode == "staged":
+            return run_staged(
+                self,
+                frames,
+                detector=detector,
+                prepare_workers=self.prepare_workers,
+                encode_workers=self.encode_workers,
+                queue_size=self.queue_size,
+                batch_size=batch_size,
+                batch_timeout_ms=batch_timeout_ms,
+            )
+        prepared = ((frame_idx, self.prepare_frame(frame, detector)) for frame_idx, frame in frames)
+        return self._encode_batches(self.iter_batches(prepared, batch_size, batch_timeout_ms))
+
+    def _encode_batches(self, batches):
+        for group in batches:
+            yield from self.encode_group(group)
+
+    def iter_batches(self, prepared_frames, batch_size: int = None, batch_timeout_ms: float = None):
+        """Group ``(frame_idx, prepared)`` pairs into encoder batches.
+
+        Strips are collected until ``batch_size`` of them are pending or the
+        oldest pending frame has waited ``batch_timeout_ms``. Without a
+        timeout the grouping depends only on the input, so every execution
+        mode encodes exactly the same batches.
+        """
+        batch_size = batch_size or self.batch_size
+        if batch_timeout_ms is None:
+            batch_timeout_ms = self.batch_timeout_ms
+        timeout_s = None if batch_timeout_ms is None else batch_timeout_ms / 1000.0
+
+        pending = []
+        n_strips = 0
+        oldest = None
+        for frame_idx, prepared in prepared_frames:
+            if oldest is None:
+                oldest = time.perf_counter()
+            pending.append((frame_idx, prepared))
+            n_strips += len(prepared)
+            timed_out = timeout_s is not None and time.perf_counter() - oldest >= timeout_s
+            if n_strips >= batch_size or timed_out:
+                yield pending
+                pending = []
+                n_strips = 0
+                oldest = None
+        if pending:
+            yield pending
+
+    def encode_group(self, group):
+        """Encode one batch from ``iter_batches``; returns ``[(frame_idx, embeddings)]``."""
+        flat = [p for _, prepared in group for p in prepared]
+        encoded = self.encode_prepared(flat)
+        results = []
+        pos = 0
+        for frame_idx, prepared in group:
+            results.append((frame_idx, encoded[pos:pos + len(prepared)]))
+            pos += len(prepared)
+        return results
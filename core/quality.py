@@ -0,0 +1,77 @@
+import cv2
+
+class QualityGate:
+    """Cheap usability checks run on an eye before it is encoded.
+
+    ``check_crop`` looks at the gray crop alone (shorter side in pixels,
+    variance of the Laplacian for sharpness, gray-level std for contrast)
+    and runs before segmentation, so obviously unusable crops never reach
+    the Hough step. ``check_segmentation`` runs after it. Each measure is
+    mapped to [0, 1] against its ``good_*`` value and the geometric mean
+    becomes ``sample.quality``; a crop where no iris circle was found has
+    its score halved.
+
+    With ``enabled=False`` nothing is dropped, but scores are still
+    computed so templates and events keep a quality value.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_size: int = 24,
+        min_sharpness: float = 50.0,
+        min_contrast: float = 15.0,
+        require_segmentation: bool = True,
+        min_score: float = 0.0,
+        good_size: int = 64,
+        good_sharpness: float = 300.0,
+        good_contrast: float = 40.0,
+    ):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.min_sharpness = min_sharpness
+        self.min_contrast = min_contrast
+        self.require_segmentation = require_segmentation
+        self.min_score = min_score
+        self.good_size = good_size
+        self.good_sharpness = good_sharpness
+        self.good_contrast = good_contrast
+
+    @classmethod
+    def from_config(cls, options: dict = None):
+        return cls(**(options or {}))
+
+    def measure(self, gray):
+        """``(size, sharpness, contrast)`` of a uint8 gray crop."""
+        size = min(gray.shape[:2])
+        if size < 3:
+            return size, 0.0, 0.0
+        _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+        _, contrast = cv2.meanStdDev(gray)
+        return size, float(std[0, 0]) ** 2, float(contrast[0, 0])
+
+    def check_crop(self, sample) -> bool:
+        """Score ``sample`` from its crop; False if it should be dropped."""
+        size, sharpness, contrast = self.measure(sample.gray)
+        sample.quality = (
+            min(1.0, size / self.good_size)
+            * min(1.0, sharpness / self.good_sharpness)
+            * min(1.0, contrast / self.good_contrast)
+        ) ** (1.0 / 3.0)
+        if not self.enabled:
+            return True
+        return (
+            size >= self.min_size
+            and sharpness >= self.min_sharpness
+            and contrast >= self.min_contrast
+        )
+
+    def check_segmentation(self, sample) -> bool:
+        """Fold segmentation success into the score; False if it should be dropped."""
+        if not sample.segmented:
+            sample.quality *= 0.5
+        if not self.enabled:
+            return True
+        if self.require_segmentation and not sample.segmented:
+            return False
+        return sample.quality >= self.min_score
@@ -0,0 +1,89 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .eye_tracker import EyeTracker
+
+def ordered_map(executor, fn, items, max_inflight: int):
+    """Like ``executor.map`` but lazy and bounded.
+
+    At most ``max_inflight`` items are submitted ahead of the consumer, and
+    results come back in input order.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_inflight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+def run_staged(
+    pipeline,
+    frames,
+    prepare_workers: int = 2,
+    encode_workers: int = 1,
+    queue_size: int = 8,
+    batch_size: int = None,
+    batch_timeout_ms: float = None,
+    detector=None,
+):
+    """Run an ``IrisPipeline`` as overlapping stages.
+
+    detect/segment/normalize run on a pool of ``prepare_workers`` threads
+    and encoding on ``encode_workers`` threads, connected by bounded
+    windows of ``queue_size`` in-flight items. Decoding happens wherever
+    ``frames`` comes from (``VideoReader`` prefetches on its own thread);
+    matching and DB writes stay with the caller. OpenCV and torch release
+    the GIL in their kernels, so the stages genuinely overlap.
+
+    Yields ``(frame_idx, embeddings)`` in frame order, with the same
+    encoder batches as the sequential ``IrisPipeline.process_frames``.
+    ``detector`` (see ``IrisPipeline.source_detector``) is shared by the
+    prepare workers. An ``EyeTracker``'s results depend on the order it
+    sees frames in, so with one detection runs on a single thread in frame
+    order and only segmentation/normalization fan out to the pool.
+    """
+    prepare_pool = ThreadPoolExecutor(max(1, prepare_workers), thread_name_prefix="iris-prepare")
+    encode_pool = ThreadPoolExecutor(max(1, encode_workers), thread_name_prefix="iris-encode")
+    detect_pool = None
+    try:
+        window = max(queue_size, prepare_workers)
+        if isinstance(detector, EyeTracker):
+            detect_pool = ThreadPoolExecutor(1, thread_name_prefix="iris-detect")
+            detected = ordered_map(
+                detect_pool,
+                lambda item: (item[0], pipeline.detect_frame(item[1], detector)),
+                frames,
+                window,
+            )
+            prepared = ordered_map(
+                prepare_pool,
+                lambda item: (item[0], pipeline.prepare_eyes(item[1])),
+                detected,
+                window,
+            )
+        else:
+            prepared = ordered_map(
+                prepare_pool,
+                lambda item: (item[0], pipeline.prepare_frame(item[1], detector)),
+                frames,
+                window,
+            )
+        batches = pipeline.iter_batches(prepared, batch_size, batch_timeout_ms)
+        encoded = ordered_map(
+            encode_pool,
+            pipeline.encode_group,
+            batches,
+            max(2, encode_workers + 1),
+        )
+        for group in encoded:
+            yield from group
+    finally:
+        if detect_pool is not None:
+            detect_pool.shutdown(wait=True, cancel_futures=True)
+        prepare_pool.shutdown(wait=True, cancel_futures=True)
+        encode_pool.shutdown(wait=True, cancel_futures=True)
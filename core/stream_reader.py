@@ -0,0 +1,142 @@
+import threading
+import time
+
+import cv2
+
+from .metrics import METRICS
+
+class LatestFrameReader:
+    """Continuously capture a live source and keep only the newest frame.
+
+    A background thread reads ``source`` (camera index, RTSP/HTTP URL or a
+    file) as fast as it produces frames; consumers always get the most
+    recent one, so slow processing drops stale frames instead of building
+    a backlog. Files are paced at their native fps and can ``loop``, which
+    makes a local video a usable stand-in for a camera.
+    """
+
+    def __init__(self, source, loop: bool = False, realtime: bool = None,
+                 reconnect_delay_s: float = 2.0):
+        self.source = int(source) if str(source).isdigit() else source
+        self.loop = loop
+        self.reconnect_delay_s = reconnect_delay_s
+        self._is_file = isinstance(self.source, str) and "://" not in self.source
+        self.realtime = self._is_file if realtime is None else realtime
+        self.fps = None
+        self.frame_skip = 1
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._latest = None  # (frame_idx, frame, captured_at)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        cap = self._open()
+        self._thread = threading.Thread(target=self._capture, args=(cap,), name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise RuntimeError(f"Could not open video source: {self.source}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or None
+        return cap
+
+    def _capture(self, cap):
+        frame_idx = 0
+        period = 1.0 / self.fps if self.realtime and self.fps else 0.0
+        next_due = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    if self._is_file and self.loop:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    if self._is_file:
+                        break
+                    # live source hiccup: reopen after a short pause
+                    cap.release()
+                    if self._stop.wait(self.reconnect_delay_s):
+                        break
+                    cap = cv2.VideoCapture(self.source)
+                    continue
+                if period:
+                    next_due += period
+                    delay = next_due - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+                with self._cond:
+                    self._latest = (frame_idx, frame, time.monotonic())
+                    self._cond.notify_all()
+                self.frames_captured += 1
+                METRICS.inc("frames_decoded")
+                frame_idx += 1
+        except Exception as exc:  # surfaced to the consumer
+            self._error = exc
+        finally:
+            cap.release()
+            with self._cond:
+                self._stop.set()
+                self._cond.notify_all()
+
+    def read(self, min_idx: int = 0, timeout: float = None):
+        """Newest ``(frame_idx, frame, captured_at)`` with ``frame_idx >= min_idx``.
+
+        Blocks until such a frame exists; returns None once the source has
+        ended or the reader was stopped.
+        """
+        with self._cond:
+            while self._latest is None or self._latest[0] < min_idx:
+                if self._stop.is_set():
+                    if self._error is not None:
+                        raise self._error
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+            return self._latest
+
+    def iter_adaptive(self, target_latency_ms: float = 500.0, max_skip: int = 30):
+        """Yield fresh frames, raising the frame skip when processing lags.
+
+        Latency is measured from a frame's capture until the consumer asks
+        for the next one (i.e. finished processing it). Above the target
+        the skip doubles, up to ``max_skip``; well below it the skip
+        relaxes by one. The current value is exposed as ``frame_skip``.
+        """
+        target_s = target_latency_ms / 1000.0
+        last = None
+        while True:
+            min_idx = 0 if last is None else last[0] + self.frame_skip
+            item = self.read(min_idx)
+            if item is None:
+                return
+            if last is not None:
+                self.frames_dropped += max(0, item[0] - last[0] - 1)
+            yield item
+            latency = time.monotonic() - item[2]
+            if latency > target_s:
+                self.frame_skip = min(max_skip, self.frame_skip * 2)
+            elif latency < 0.5 * target_s and self.frame_skip > 1:
+                self.frame_skip -= 1
+            last = item
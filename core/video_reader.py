@@ -1,19 +1,169 @@
+import queue
+import threading
+import time
+
 import cv2
 
+from .metrics import METRICS
+
+_END = object()
+
+class _Raised:
+    def __init__(self, exc):
+        self.exc = exc
+
+def prefetch(iterable, depth: int):
+    """Run ``iterable`` on a background thread, buffering up to ``depth`` items.
+
+    Items come out in the original order. Exceptions raised by the producer
+    are re-raised in the consumer, and closing the returned generator stops
+    the producer.
+    """
+    buf = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as exc:  # handed to the consumer
+            put(_Raised(exc))
+            return
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+        put(_END)
+
+    worker = threading.Thread(target=produce, name="prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buf.get()
+            if item is _END:
+                break
+            if isinstance(item, _Raised):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
 class VideoReader:
-    def __init__(self, frame_skip: int = 5):
-        self.frame_skip = frame_skip
+    """Sampled frame iterator over a video file or stream.
+
+    Skipped frames are only ``grab()``-ed, so they are never converted or
+    copied out of the decoder. With ``prefetch > 0`` decoding runs on a
+    background thread that keeps up to that many sampled frames queued.
+
+    With a ``sampler`` (a ``MotionSampler``) ``frame_skip`` is ignored:
+    every ``sampler.probe_every``-th frame is decoded and the sampler picks
+    which of them to yield.
+    """
 
-    def iter_frames(self, video_path: str):
+    def __init__(self, frame_skip: int = 5, prefetch: int = 4, sampler=None):
+        self.frame_skip = max(1, int(frame_skip))
+        self.prefetch = prefetch
+        self.sampler = sampler
+        self.fps = None
+        self.frame_count = None
+
+    def _open(self, video_path: str):
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             raise RuntimeError(f"Could not open video: {video_path}")
-        frame_idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            if frame_idx % self.frame_skip == 0:
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or None
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_count = count if count > 0 else None
+        return cap
+
+    @property
+    def sampled_frame_count(self):
+        """Frames a full ``iter_frames`` pass yields, if known up front.
+
+        None if the source doesn't report a length or a motion sampler
+        decides as it goes.
+        """
+        if self.frame_count is None or self.sampler is not None:
+            return None
+        return -(-self.frame_count // self.frame_skip)
+
+    def _wrap(self, frames):
+        return prefetch(frames, self.prefetch) if self.prefetch > 0 else frames
+
+    def iter_frames(self, video_path: str, start_frame: int = 0, end_frame: int = None):
+        """Yield ``(frame_idx, frame)`` for every ``frame_skip``-th frame.
+
+        ``start_frame`` / ``end_frame`` restrict decoding to a frame range;
+        frame indices stay absolute, so sampling lines up with a full pass.
+        With a motion sampler, only the frames it picks are yielded.
+        """
+        cap = self._open(video_path)
+        if self.sampler is None:
+            return self._wrap(self._decode(cap, start_frame, end_frame, self.frame_skip))
+        frames = self._decode(cap, start_frame, end_frame, self.sampler.probe_every)
+        return self._wrap(self.sampler.filter(frames))
+
+    def _decode(self, cap, start_frame, end_frame, step):
+        try:
+            frame_idx = max(0, int(start_frame))
+            if frame_idx:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            # decode time of a sampled frame includes the grabs before it
+            started = time.perf_counter()
+            while end_frame is None or frame_idx < end_frame:
+                if frame_idx % step == 0:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    METRICS.observe("decode", time.perf_counter() - started)
+                    METRICS.inc("frames_decoded")
+                    yield frame_idx, frame
+                    started = time.perf_counter()
+                elif not cap.grab():
+                    break
+                frame_idx += 1
+        finally:
+            cap.release()
+
+    def iter_positions(self, video_path: str, frame_indices=None, timestamps_ms=None):
+        """Seek to specific positions instead of decoding sequentially.
+
+        Pass either ``frame_indices`` or ``timestamps_ms``; yields
+        ``(frame_idx, frame)`` for each position that could be read. Worth
+        it for sparse sampling, where skipping by seek is cheaper than
+        grabbing every frame in between.
+        """
+        if (frame_indices is None) == (timestamps_ms is None):
+            raise ValueError("Pass exactly one of frame_indices or timestamps_ms")
+        cap = self._open(video_path)
+        if frame_indices is not None:
+            positions = [(cv2.CAP_PROP_POS_FRAMES, int(i)) for i in sorted(frame_indices)]
+        else:
+            positions = [(cv2.CAP_PROP_POS_MSEC, float(t)) for t in sorted(timestamps_ms)]
+        return self._wrap(self._seek(cap, positions))
+
+    def _seek(self, cap, positions):
+        try:
+            for prop, value in positions:
+                cap.set(prop, value)
+                # position of the frame about to be read
+                frame_idx = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+                with METRICS.timer("decode"):
+                    ret, frame = cap.read()
+                if not ret:
+                    continue
+                METRICS.inc("frames_decoded")
                 yield frame_idx, frame
-            frame_idx += 1
-        cap.release()
+        finally:
+            cap.release()
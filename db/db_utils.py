@@ -1,23 +1,120 @@
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from .migrations import upgrade
 from .models import Base
 
-def get_engine(db_url: str):
-    engine = create_engine(db_url, echo=False, future=True)
-    return engine
+DEFAULT_DB_URL = "sqlite:///iris_attendance.db"
+
+# Overridable through the `db` section of config.yaml.
+DEFAULT_DB_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "sqlite_journal_mode": "WAL",
+    "sqlite_synchronous": "NORMAL",
+    "sqlite_busy_timeout_ms": 30000,
+}
+
+_ENGINES = {}
+_SESSION_FACTORIES = {}
+_LOCK = threading.Lock()
+
+def _db_options(options):
+    merged = dict(DEFAULT_DB_OPTIONS)
+    merged.update(options or {})
+    return merged
+
+def _install_sqlite_pragmas(engine, options):
+    journal_mode = options["sqlite_journal_mode"]
+    synchronous = options["sqlite_synchronous"]
+    busy_timeout_ms = int(options["sqlite_busy_timeout_ms"])
 
-def init_db(db_url: str):
-    engine = get_engine(db_url)
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if journal_mode:
+                cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            if synchronous:
+                cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        finally:
+            cursor.close()
+
+def get_engine(db_url: str, options: dict = None):
+    """Process-wide engine for ``db_url``, created on first use.
+
+    ``options`` (pool sizing, SQLite pragmas; see DEFAULT_DB_OPTIONS) only
+    take effect for the call that creates the engine.
+    """
+    engine = _ENGINES.get(db_url)
+    if engine is not None:
+        return engine
+    with _LOCK:
+        engine = _ENGINES.get(db_url)
+        if engine is not None:
+            return engine
+        opts = _db_options(options)
+        url = make_url(db_url)
+        kwargs = {"echo": False, "future": True, "pool_pre_ping": True}
+        is_sqlite = url.get_backend_name() == "sqlite"
+        in_memory = is_sqlite and url.database in (None, "", ":memory:")
+        if is_sqlite:
+            # the pool hands connections to whichever thread asks for them
+            kwargs["connect_args"] = {
+                "check_same_thread": False,
+                "timeout": opts["sqlite_busy_timeout_ms"] / 1000.0,
+            }
+        if not in_memory:
+            kwargs.update(
+                pool_size=opts["pool_size"],
+                max_overflow=opts["max_overflow"],
+                pool_timeout=opts["pool_timeout"],
+                pool_recycle=opts["pool_recycle"],
+            )
+        engine = create_engine(db_url, **kwargs)
+        if is_sqlite and not in_memory:
+            _install_sqlite_pragmas(engine, opts)
+        _ENGINES[db_url] = engine
+        return engine
+
+def init_db(db_url: str, options: dict = None):
+    engine = get_engine(db_url, options)
     Base.metadata.create_all(engine)
+    upgrade(engine)
     return engine
 
-def get_session_from_url(db_url: str):
-    engine = get_engine(db_url)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+def get_session_from_url(db_url: str, options: dict = None):
+    SessionLocal = _SESSION_FACTORIES.get(db_url)
+    if SessionLocal is None:
+        engine = get_engine(db_url, options)
+        with _LOCK:
+            SessionLocal = _SESSION_FACTORIES.setdefault(
+                db_url, sessionmaker(bind=engine, autoflush=False, autocommit=False)
+            )
     return SessionLocal
 
 def get_session(cfg):
-    db_url = cfg.get("db_url", "sqlite:///iris_attendance.db")
-    engine = get_engine(db_url)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    return SessionLocal
+    db_url = cfg.get("db_url", DEFAULT_DB_URL)
+    return get_session_from_url(db_url, cfg.get("db"))
+
+@contextmanager
+def session_scope(cfg):
+    """Short-lived session from the shared engine.
+
+    Commits when the block succeeds, rolls back on error, always closes.
+    """
+    session = get_session(cfg)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,108 @@
+import uuid
+
+from sqlalchemy import inspect, text
+
+from .models import Base, DatabaseInfo
+
+def create_missing_indexes(engine):
+    """Create indexes declared on the models but missing from the database.
+
+    ``create_all`` only creates indexes together with new tables, so
+    databases created before an index was added need this step. Returns
+    the names of the indexes that were created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+def add_missing_columns(engine):
+    """Add nullable columns declared on the models but missing from the database.
+
+    Returns the added columns as ``"table.column"``.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(
+                        f"Cannot add NOT NULL column {table.name}.{column.name} automatically"
+                    )
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def enable_sqlite_autoincrement(engine):
+    """Rebuild SQLite tables declared ``sqlite_autoincrement`` that lack it.
+
+    SQLite can't add AUTOINCREMENT to an existing table, so the table is
+    renamed, recreated from the model and its rows copied over (ids kept).
+    Returns the names of the rebuilt tables; a no-op on other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    rebuilt = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": table.name},
+            ).scalar()
+            if sql is None or "AUTOINCREMENT" in sql.upper():
+                continue
+            old = f"_old_{table.name}"
+            conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {old}"))
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+            table.create(bind=conn)
+            columns = ", ".join(column.name for column in table.columns)
+            conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old}"))
+            conn.execute(text(f"DROP TABLE {old}"))
+            rebuilt.append(table.name)
+    return rebuilt
+
+def ensure_database_id(engine):
+    """Give the database a random ``database_id`` if it has none yet.
+
+    Returns ``["database_info.database_id"]`` if one was written.
+    """
+    with engine.begin() as conn:
+        found = conn.execute(
+            text("SELECT value FROM database_info WHERE key = 'database_id'")
+        ).scalar()
+        if found is not None:
+            return []
+        conn.execute(DatabaseInfo.__table__.insert().values(key="database_id", value=uuid.uuid4().hex))
+    return ["database_info.database_id"]
+
+def upgrade(engine):
+    """Bring an existing database up to the current models; safe to re-run.
+
+    Returns the names of the columns, rebuilt tables, indexes and
+    ``database_info`` entries that were created.
+    """
+    return (
+        add_missing_columns(engine)
+        + enable_sqlite_autoincrement(engine)
+        + create_missing_indexes(engine)
+        + ensure_database_id(engine)
+    )
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Float,
     LargeBinary,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -14,6 +15,10 @@ Base = declarative_base()
 
 class Person(Base):
     __tablename__ = "persons"
+    __table_args__ = (
+        Index("ix_persons_created_at", "created_at"),
+        Index("ix_persons_department_created_at", "department", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -29,6 +34,12 @@ class Person(Base):
 
 class IrisTemplate(Base):
     __tablename__ = "iris_templates"
+    __table_args__ = (
+        Index("ix_iris_templates_person_id", "person_id"),
+        # never reuse ids: TemplateGallery.refresh and gallery snapshots
+        # track rows by id, so a recycled id would keep a stale embedding
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     person_id = Column(Integer, ForeignKey("persons.id"), nullable=False)
@@ -42,8 +53,52 @@ class IrisTemplate(Base):
     def __repr__(self):
         return f"<IrisTemplate id={self.id} person_id={self.person_id} eye_side={self.eye_side}>"
 
+class DatabaseInfo(Base):
+    """Key/value facts about the database itself.
+
+    ``database_id`` is a random id written when the schema is first
+    created (``db.migrations.ensure_database_id``); gallery snapshots
+    record it so they are never applied to a different database.
+    """
+
+    __tablename__ = "database_info"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(String(255), nullable=False)
+
+    def __repr__(self):
+        return f"<DatabaseInfo {self.key}={self.value}>"
+
+class ProcessedVideo(Base):
+    """Checkpoint for batch attendance runs: one row per finished (video, camera).
+
+    Written in the same transaction as the video's events, so a video is
+    either fully recorded or not at all.
+    """
+
+    __tablename__ = "processed_videos"
+    __table_args__ = (
+        Index("ix_processed_videos_path_camera", "video_path", "camera_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    video_path = Column(String(1024), nullable=False)
+    camera_id = Column(String(100), nullable=False)
+    frames = Column(Integer, nullable=False)
+    events = Column(Integer, nullable=False)
+    seconds = Column(Float, nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ProcessedVideo video_path={self.video_path} camera_id={self.camera_id} events={self.events}>"
+
 class AttendanceEvent(Base):
     __tablename__ = "attendance_events"
+    __table_args__ = (
+        Index("ix_attendance_events_timestamp", "timestamp"),
+        Index("ix_attendance_events_person_timestamp", "person_id", "timestamp"),
+        Index("ix_attendance_events_camera_timestamp", "camera_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     person_id = Column(Integer, ForeignKey("persons.id"), nullable=False)
@@ -51,6 +106,7 @@ class AttendanceEvent(Base):
     video_path = Column(String(1024), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     score = Column(Float, nullable=False)
+    quality_score = Column(Float, nullable=True)
     frame_idx = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from .models import AttendanceEvent, IrisTemplate, Person
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row ``(timestamp, id)``."""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+def _after(ts_col, id_col, cursor):
+    """Rows strictly after ``cursor`` in ``(ts DESC, id DESC)`` order."""
+    ts, row_id = decode_cursor(cursor)
+    return or_(ts_col < ts, and_(ts_col == ts, id_col < row_id))
+
+def _page(rows, limit, ts_of):
+    """Trim the look-ahead row and build the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(ts_of(last), last.id)
+
+def list_persons(session, limit: int = 50, cursor: str = None, department: str = None,
+                 created_after: datetime = None, created_before: datetime = None):
+    """Newest-first page of persons with their template counts.
+
+    Template counts are computed in SQL (an index lookup per returned row),
+    so embedding blobs are never loaded. Returns ``(rows, next_cursor)``;
+    each row has ``id, name, employee_code, department, created_at,
+    templates``.
+    """
+    templates = (
+        select(func.count())
+        .where(IrisTemplate.person_id == Person.id)
+        .correlate(Person)
+        .scalar_subquery()
+    )
+    query = select(
+        Person.id,
+        Person.name,
+        Person.employee_code,
+        Person.department,
+        Person.created_at,
+        templates.label("templates"),
+    )
+    if department is not None:
+        query = query.where(Person.department == department)
+    if created_after is not None:
+        query = query.where(Person.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Person.created_at < created_before)
+    if cursor:
+        query = query.where(_after(Person.created_at, Person.id, cursor))
+    query = query.order_by(Person.created_at.desc(), Person.id.desc()).limit(limit + 1)
+    return _page(session.execute(query).all(), limit, lambda row: row.created_at)
+
+def list_events(session, limit: int = 50, cursor: str = None, camera_id: str = None,
+                person_id: int = None, department: str = None, start: datetime = None,
+                end: datetime = None):
+    """Newest-first page of attendance events.
+
+    Returns ``(events, next_cursor)``; pass ``next_cursor`` back to continue
+    further into the past. ``start``/``end`` bound ``timestamp`` as
+    ``[start, end)``.
+    """
+    query = select(AttendanceEvent)
+    if department is not None:
+        query = query.join(Person, Person.id == AttendanceEvent.person_id).where(
+            Person.department == department
+        )
+    if camera_id is not None:
+        query = query.where(AttendanceEvent.camera_id == camera_id)
+    if person_id is not None:
+        query = query.where(AttendanceEvent.person_id == person_id)
+    if start is not None:
+        query = query.where(AttendanceEvent.timestamp >= start)
+    if end is not None:
+        query = query.where(AttendanceEvent.timestamp < end)
+    if cursor:
+        query = query.where(_after(AttendanceEvent.timestamp, AttendanceEvent.id, cursor))
+    query = query.order_by(AttendanceEvent.timestamp.desc(), AttendanceEvent.id.desc()).limit(
+        limit + 1
+    )
+    return _page(session.execute(query).scalars().all(), limit, lambda e: e.timestamp)
@@ -0,0 +1,233 @@
+"""Enroll many people from a CSV or JSONL manifest.
+
+Each manifest row has ``name``, ``employee_code``, ``department`` (optional)
+and ``video`` (relative paths resolve against the manifest's folder).
+Videos are processed by worker processes that each build the pipeline
+once; the main process writes people in batched transactions. Employee
+codes already in the database are skipped, so an interrupted run can
+simply be started again. Every row gets a line in the JSONL report
+(appended, default ``<manifest>.report.jsonl``), written only after its
+batch is committed.
+
+Usage:
+    python scripts/bulk_enroll.py --manifest onboarding.csv --workers 4
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from db.db_utils import get_session, init_db
+from db.models import Person
+from services.enrollment_service import EnrollmentService
+
+_SERVICE = None
+
+
+def read_manifest(path):
+    """Manifest rows as dicts with ``line`` numbers; CSV unless the suffix is .jsonl/.json."""
+    path = Path(path)
+    with open(path, newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".json"):
+            rows = [(n, json.loads(line)) for n, line in enumerate(f, 1) if line.strip()]
+        else:
+            rows = list(enumerate(csv.DictReader(f), 2))
+    manifest = []
+    for line, row in rows:
+        video = str(row.get("video") or "").strip()
+        if video and not Path(video).is_absolute():
+            video = str(path.parent / video)
+        manifest.append({
+            "line": line,
+            "name": str(row.get("name") or "").strip(),
+            "employee_code": str(row.get("employee_code") or "").strip(),
+            "department": str(row.get("department") or "").strip(),
+            "video": video,
+        })
+    return manifest
+
+
+def _init_worker(cfg, threads):
+    global _SERVICE
+    # imported here so the main process never loads torch
+    from core.pipeline import IrisPipeline
+
+    encoder_cfg = cfg.setdefault("encoder", {})
+    if encoder_cfg.get("intra_op_threads") is None:
+        encoder_cfg["intra_op_threads"] = threads
+    enroll_cfg = cfg.get("enrollment", {})
+    _SERVICE = EnrollmentService(
+        IrisPipeline(cfg),
+        None,
+        frame_skip=cfg.get("video", {}).get("frame_skip", 3),
+        max_templates=enroll_cfg.get("max_templates", 3),
+        max_similarity=enroll_cfg.get("max_similarity", 0.95),
+        good_quality=enroll_cfg.get("good_quality", 0.5),
+        stop_after=enroll_cfg.get("stop_after"),
+    )
+
+
+def _extract(video):
+    start = time.perf_counter()
+    templates = _SERVICE.extract_templates(video)
+    return templates, time.perf_counter() - start
+
+
+def describe(exc):
+    lines = str(exc).splitlines()
+    return f"{type(exc).__name__}: {lines[0] if lines else ''}"
+
+
+def existing_codes(session, codes, chunk=500):
+    found = set()
+    codes = list(codes)
+    for i in range(0, len(codes), chunk):
+        found.update(
+            code for (code,) in session.query(Person.employee_code).filter(
+                Person.employee_code.in_(codes[i:i + chunk])
+            )
+        )
+    return found
+
+
+class BatchWriter:
+    """Commit enrolled people every ``commit_every`` rows, then report them.
+
+    If a batch fails to commit, its rows are retried one transaction each
+    so one bad row doesn't take the others down with it.
+    """
+
+    def __init__(self, session, report, commit_every):
+        self.service = EnrollmentService(None, session)
+        self.session = session
+        self.report = report
+        self.commit_every = commit_every
+        self.pending = []
+        self.counts = {"enrolled": 0, "skipped": 0, "failed": 0}
+
+    def record(self, entry):
+        self.counts[entry["status"]] += 1
+        self.report.write(json.dumps(entry) + "\n")
+        self.report.flush()
+        extra = entry.get("error") or entry.get("reason") or f"person_id={entry.get('person_id')}"
+        print(f"line {entry['line']:>5} {entry['employee_code']:<20} {entry['status']:<8} {extra}")
+
+    def add(self, row, templates, seconds):
+        self.pending.append((row, templates, seconds))
+        if len(self.pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            ids = [self._add(row, templates) for row, templates, _ in self.pending]
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            ids = []
+            for row, templates, _ in self.pending:
+                try:
+                    ids.append(self._add(row, templates))
+                    self.session.commit()
+                except Exception as exc:
+                    self.session.rollback()
+                    ids.append(exc)
+        for (row, templates, seconds), person_id in zip(self.pending, ids):
+            entry = {"line": row["line"], "employee_code": row["employee_code"], "seconds": round(seconds, 2)}
+            if isinstance(person_id, Exception):
+                entry.update(status="failed", error=describe(person_id))
+            else:
+                entry.update(status="enrolled", person_id=person_id, templates=len(templates))
+            self.record(entry)
+        self.pending = []
+
+    def _add(self, row, templates):
+        meta = {k: row[k] for k in ("name", "employee_code", "department")}
+        return self.service.add_person(meta, templates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll people listed in a CSV or JSONL manifest.")
+    parser.add_argument("--manifest", required=True)
+    parser.add_argument("--report", default=None, help="JSONL report (appended); default <manifest>.report.jsonl")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--commit-every", type=int, default=25, help="People per transaction.")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    init_db(cfg["db_url"], cfg.get("db"))
+    session = get_session(cfg)()
+    rows = read_manifest(args.manifest)
+    report_path = args.report or str(Path(args.manifest).with_suffix(".report.jsonl"))
+    enrolled = existing_codes(session, {row["employee_code"] for row in rows if row["employee_code"]})
+    threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+
+    started = time.perf_counter()
+    with open(report_path, "a") as report:
+        writer = BatchWriter(session, report, args.commit_every)
+        todo = []
+        seen = set()
+        for row in rows:
+            entry = {"line": row["line"], "employee_code": row["employee_code"]}
+            if not (row["name"] and row["employee_code"] and row["video"]):
+                writer.record(dict(entry, status="failed", error="name, employee_code and video are required"))
+            elif row["employee_code"] in enrolled:
+                writer.record(dict(entry, status="skipped", reason="already enrolled"))
+            elif row["employee_code"] in seen:
+                writer.record(dict(entry, status="failed", error="duplicate employee_code in manifest"))
+            elif not os.path.exists(row["video"]):
+                writer.record(dict(entry, status="failed", error=f"video not found: {row['video']}"))
+            else:
+                seen.add(row["employee_code"])
+                todo.append(row)
+
+        if todo:
+            with ProcessPoolExecutor(
+                max_workers=max(1, min(args.workers, len(todo))),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(cfg, threads),
+            ) as pool:
+                futures = {pool.submit(_extract, row["video"]): row for row in todo}
+                for future in as_completed(futures):
+                    row = futures[future]
+                    try:
+                        templates, seconds = future.result()
+                    except Exception as exc:
+                        writer.record({
+                            "line": row["line"],
+                            "employee_code": row["employee_code"],
+                            "status": "failed",
+                            "error": describe(exc),
+                        })
+                        continue
+                    writer.add(row, templates, seconds)
+        writer.flush()
+    session.close()
+
+    elapsed = time.perf_counter() - started
+    counts = writer.counts
+    print(
+        f"{counts['enrolled']} enrolled, {counts['skipped']} skipped, {counts['failed']} failed "
+        f"in {elapsed:.1f}s ({counts['enrolled'] / max(elapsed, 1e-9) * 60:.1f} people/min). "
+        f"Report: {report_path}"
+    )
+    if counts["enrolled"] and cfg.get("gallery", {}).get("snapshot_dir"):
+        print("Re-export the gallery snapshot with scripts/export_gallery.py.")
+    if counts["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
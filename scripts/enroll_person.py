@@ -13,13 +13,21 @@ def main():
     args = parser.parse_args()
 
     cfg = load_config()
+    enroll_cfg = cfg.get("enrollment", {})
     # init DB (creates tables if not exist)
-    init_db(cfg["db_url"])
+    init_db(cfg["db_url"], cfg.get("db"))
     SessionLocal = get_session(cfg)
     session = SessionLocal()
 
     pipeline = IrisPipeline(cfg)
-    service = EnrollmentService(pipeline, session)
+    service = EnrollmentService(
+        pipeline,
+        session,
+        max_templates=enroll_cfg.get("max_templates", 3),
+        max_similarity=enroll_cfg.get("max_similarity", 0.95),
+        good_quality=enroll_cfg.get("good_quality", 0.5),
+        stop_after=enroll_cfg.get("stop_after"),
+    )
 
     person_id = service.enroll_from_video(
         {
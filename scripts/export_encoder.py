@@ -0,0 +1,29 @@
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from core.encoder import IrisEncoder
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the iris encoder as an ONNX graph.")
+    parser.add_argument("--output", default=None, help="Defaults to encoder.onnx_path from config.yaml")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    output = args.output or cfg.get("encoder", {}).get("onnx_path")
+    if not output:
+        parser.error("no --output given and encoder.onnx_path is not set")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+
+    # export always starts from the eager fp32 weights
+    encoder = IrisEncoder(cfg["models"].get("deepirisnet2", None), device="cpu")
+    encoder.export_onnx(output, (cfg["norm"]["radial_res"], cfg["norm"]["angular_res"]))
+    print(f"Wrote {output}. Set encoder.backend: onnx in config/config.yaml to use it.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from core.gallery_snapshot import read_manifest
+from db.db_utils import init_db, session_scope
+from services.template_gallery import export_snapshot, snapshot_status
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export enrolled templates to a memory-mapped gallery snapshot."
+    )
+    parser.add_argument("--output", default=None, help="Defaults to gallery.snapshot_dir from config.yaml")
+    parser.add_argument("--check", action="store_true", help="Only report whether the snapshot is current.")
+    parser.add_argument("--force", action="store_true", help="Re-export even if the snapshot is current.")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    output = args.output or cfg.get("gallery", {}).get("snapshot_dir")
+    if not output:
+        parser.error("no --output given and gallery.snapshot_dir is not set")
+    model_version = cfg.get("encoder", {}).get("model_version")
+    init_db(cfg["db_url"], cfg.get("db"))
+
+    with session_scope(cfg) as session:
+        status = snapshot_status(read_manifest(output), session, model_version)
+        if args.check:
+            print(f"{output}: {status or 'current'}")
+            raise SystemExit(0 if status is None else 1)
+        if status is None and not args.force:
+            print(f"{output} is already current.")
+            return
+        manifest = export_snapshot(session, output, model_version)
+    print(
+        f"Wrote {manifest['count']} template(s) x {manifest['embedding_dim']} to {output} "
+        f"(model {model_version}, was: {status or 'current'})."
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,239 @@
+"""Log attendance from recorded video.
+
+Single video:
+    python scripts/process_video.py --video cam01.mp4 --camera_id CAM01
+
+Batch (directories, globs, or CSV/JSONL manifests of video,camera_id):
+    python scripts/process_video.py --batch recordings/ --workers 4
+
+In batch mode videos are spread over worker processes that each load the
+pipeline and gallery once. Workers only compute events; the main process
+writes them. Both modes write each video's events together with its
+``processed_videos`` checkpoint row in one transaction, so videos already
+processed (by either mode) are skipped and events are never duplicated. Without ``--camera_id``,
+videos found in directories or globs use their parent folder name as the
+camera id.
+"""
 import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
 from config.config_loader import load_config
-from core.pipeline import IrisPipeline
-from services.attendance_service import AttendanceService
+from core.ann_index import IVFIndex
+from core.metrics import METRICS
+from core.motion_sampler import MotionSampler
 from db.db_utils import get_session, init_db
+from db.models import ProcessedVideo
+from services.event_writer import EventWriter
+from services.template_gallery import TemplateGallery
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--video", required=True)
-    parser.add_argument("--camera_id", required=True)
-    args = parser.parse_args()
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mkv", ".mov", ".m4v", ".mpg", ".mpeg", ".ts"}
 
-    cfg = load_config()
-    init_db(cfg["db_url"])
-    SessionLocal = get_session(cfg)
-    session = SessionLocal()
+_SERVICE = None
+
+
+def build_service(cfg, session):
+    # imported here so the batch parent process never loads torch
+    from core.pipeline import IrisPipeline
+    from services.attendance_service import AttendanceService
 
     pipeline = IrisPipeline(cfg)
-    service = AttendanceService(
+    gallery = TemplateGallery(index=IVFIndex.from_config(cfg.get("match", {}).get("ann")))
+    gallery.load_snapshot(
+        cfg.get("gallery", {}).get("snapshot_dir"),
+        session,
+        cfg.get("encoder", {}).get("model_version"),
+        pipeline.encoder.embedding_dim,
+    )
+    return AttendanceService(
         pipeline,
         session,
+        gallery=gallery,
         threshold=cfg["match"]["threshold"],
         frame_skip=cfg["video"]["frame_skip"],
+        debounce_seconds=cfg.get("attendance", {}).get("debounce_seconds", 0.0),
+        insert_batch_size=cfg.get("attendance", {}).get("insert_batch_size", 500),
+        sampler=MotionSampler.from_config(cfg["video"].get("motion")),
+    )
+
+
+def collect_videos(inputs, camera_id=None):
+    """``[(abs video path, camera id), ...]`` from directories, globs and manifests."""
+    found = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_file() and path.suffix.lower() in (".csv", ".jsonl", ".json"):
+            with open(path, newline="") as f:
+                if path.suffix.lower() == ".csv":
+                    rows = list(csv.DictReader(f))
+                else:
+                    rows = [json.loads(line) for line in f if line.strip()]
+            for row in rows:
+                video = Path(str(row["video"]).strip())
+                if not video.is_absolute():
+                    video = path.parent / video
+                found.append((str(video.resolve()), str(row.get("camera_id") or camera_id or "").strip()))
+            continue
+        if path.is_dir():
+            paths = sorted(p for p in path.rglob("*") if p.suffix.lower() in VIDEO_EXTENSIONS)
+        else:
+            paths = sorted(Path(p) for p in glob.glob(item, recursive=True))
+        found.extend((str(p.resolve()), camera_id or p.resolve().parent.name) for p in paths if p.is_file())
+    return found
+
+
+def record_video(session, video, camera_id, rows, stats, seconds, insert_batch_size):
+    """Write a video's events and its ``processed_videos`` row in one transaction.
+
+    Returns the number of events written; rolls back and re-raises on error.
+    """
+    try:
+        writer = EventWriter(session, batch_size=insert_batch_size)
+        writer.add(rows)
+        writer.flush()
+        session.add(ProcessedVideo(
+            video_path=video,
+            camera_id=camera_id,
+            frames=stats["frames"],
+            events=writer.written,
+            seconds=seconds,
+        ))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return writer.written
+
+
+def _init_worker(cfg, threads):
+    global _SERVICE
+    encoder_cfg = cfg.setdefault("encoder", {})
+    if encoder_cfg.get("intra_op_threads") is None:
+        encoder_cfg["intra_op_threads"] = threads
+    _SERVICE = build_service(cfg, get_session(cfg)())
+
+
+def _process(video, camera_id):
+    start = time.perf_counter()
+    rows = [row for batch in _SERVICE.iter_video_events(video, camera_id) for row in batch]
+    # release the read snapshot so the writer isn't held back
+    _SERVICE.db.rollback()
+    return rows, _SERVICE.last_video, time.perf_counter() - start
+
+
+def run_batch(cfg, inputs, camera_id, workers):
+    session = get_session(cfg)()
+    videos = collect_videos(inputs, camera_id)
+    done = {(p, c) for p, c in session.query(ProcessedVideo.video_path, ProcessedVideo.camera_id)}
+    todo = []
+    skipped = 0
+    for video, cam in dict.fromkeys(videos):
+        if not cam:
+            print(f"{video}: no camera id (pass --camera_id or add a camera_id column)")
+        elif (video, cam) in done:
+            skipped += 1
+        else:
+            todo.append((video, cam))
+    print(f"{len(todo)} video(s) to process, {skipped} already done.")
+
+    started = time.perf_counter()
+    totals = {"videos": 0, "failed": 0, "frames": 0, "video_frames": 0, "events": 0}
+    threads = max(1, (os.cpu_count() or 1) // max(1, workers))
+    insert_batch_size = cfg.get("attendance", {}).get("insert_batch_size", 500)
+    if todo:
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(workers, len(todo))),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(cfg, threads),
+        ) as pool:
+            futures = {pool.submit(_process, video, cam): (video, cam) for video, cam in todo}
+            for future in as_completed(futures):
+                video, cam = futures[future]
+                try:
+                    rows, stats, seconds = future.result()
+                    written = record_video(session, video, cam, rows, stats, seconds, insert_batch_size)
+                except Exception as exc:
+                    session.rollback()
+                    totals["failed"] += 1
+                    print(f"FAILED {video} [{cam}]: {type(exc).__name__}: {exc}")
+                    continue
+                totals["videos"] += 1
+                totals["frames"] += stats["frames"]
+                totals["video_frames"] += stats["video_frames"] or 0
+                totals["events"] += written
+                print(f"{video} [{cam}]: {written} event(s), {stats['frames']} frame(s) "
+                      f"in {seconds:.1f}s")
+    session.close()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"Processed {totals['videos']} video(s), {totals['failed']} failed, {skipped} skipped; "
+        f"{totals['events']} event(s) in {elapsed:.1f}s."
+    )
+    print(
+        f"Throughput: {totals['frames'] / elapsed:.1f} sampled frames/s, "
+        f"{totals['video_frames'] / elapsed:.1f} video frames/s, "
+        f"{totals['videos'] / elapsed * 3600:.1f} videos/hour."
+    )
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video")
+    source.add_argument("--batch", nargs="+", metavar="INPUT",
+                        help="Directories, glob patterns, or CSV/JSONL manifests with video,camera_id.")
+    parser.add_argument("--camera_id", default=None)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    cfg = load_config()
+    init_db(cfg["db_url"], cfg.get("db"))
+
+    if args.batch:
+        totals = run_batch(cfg, args.batch, args.camera_id, args.workers)
+        if totals["failed"]:
+            raise SystemExit(1)
+        return
+
+    if not args.camera_id:
+        parser.error("--camera_id is required with --video")
+    SessionLocal = get_session(cfg)
+    session = SessionLocal()
+    video = str(Path(args.video).resolve())
+    done = session.query(ProcessedVideo.id).filter(
+        ProcessedVideo.video_path == video, ProcessedVideo.camera_id == args.camera_id
+    ).first()
+    if done:
+        print(f"{video} [{args.camera_id}] was already processed; skipping.")
+        return
+    service = build_service(cfg, session)
+    start = time.perf_counter()
+    rows = [row for batch in service.iter_video_events(video, args.camera_id) for row in batch]
+    events = record_video(
+        session, video, args.camera_id, rows, service.last_video, time.perf_counter() - start,
+        cfg.get("attendance", {}).get("insert_batch_size", 500),
     )
-    service.process_video(args.video, args.camera_id)
-    print("Attendance processing completed.")
+    print(f"Attendance processing completed. Logged {events} event(s).")
+    counters = METRICS.snapshot()["counters"]
+    if METRICS.enabled and counters["eyes_detected"]:
+        print(
+            f"Quality gate skipped {counters['eyes_rejected']} of {counters['eyes_detected']} "
+            f"detected eye(s) ({counters['eyes_rejected'] / counters['eyes_detected']:.1%})."
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from config.config_loader import load_config
+from core.ann_index import IVFIndex
+from core.pipeline import IrisPipeline
+from core.stream_reader import LatestFrameReader
+from services.attendance_service import AttendanceService
+from services.template_gallery import TemplateGallery
+from db.db_utils import get_session, init_db
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Log attendance continuously from a camera, RTSP URL or looping video file."
+    )
+    parser.add_argument("--source", required=True, help="Camera index, stream URL or video file.")
+    parser.add_argument("--camera_id", required=True)
+    parser.add_argument("--loop", action="store_true", help="Restart file sources at the end.")
+    parser.add_argument("--target_latency_ms", type=float, default=None)
+    parser.add_argument("--max_skip", type=int, default=None)
+    parser.add_argument("--duration_s", type=float, default=None, help="Stop after this many seconds.")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    stream_cfg = cfg.get("stream", {})
+    attendance_cfg = cfg.get("attendance", {})
+    init_db(cfg["db_url"], cfg.get("db"))
+    SessionLocal = get_session(cfg)
+    session = SessionLocal()
+
+    pipeline = IrisPipeline(cfg)
+    gallery = TemplateGallery(index=IVFIndex.from_config(cfg.get("match", {}).get("ann")))
+    gallery.load_snapshot(
+        cfg.get("gallery", {}).get("snapshot_dir"),
+        session,
+        cfg.get("encoder", {}).get("model_version"),
+        pipeline.encoder.embedding_dim,
+    )
+    service = AttendanceService(
+        pipeline,
+        session,
+        gallery=gallery,
+        threshold=cfg["match"]["threshold"],
+        debounce_seconds=attendance_cfg.get("debounce_seconds", 0.0),
+        insert_batch_size=attendance_cfg.get("insert_batch_size", 500),
+    )
+
+    target_latency_ms = args.target_latency_ms or stream_cfg.get("target_latency_ms", 500)
+    max_skip = args.max_skip or stream_cfg.get("max_skip", 30)
+    started = time.monotonic()
+    stats = {"frames": 0, "eyes": 0, "last_report": started}
+
+    with LatestFrameReader(args.source, loop=args.loop) as reader:
+        frames = reader.iter_adaptive(target_latency_ms=target_latency_ms, max_skip=max_skip)
+
+        def on_frame(frame_idx, n_eyes):
+            stats["frames"] += 1
+            stats["eyes"] += n_eyes
+            now = time.monotonic()
+            if now - stats["last_report"] >= 5.0:
+                stats["last_report"] = now
+                print(
+                    f"[{now - started:7.1f}s] processed={stats['frames']} "
+                    f"captured={reader.frames_captured} skip={reader.frame_skip} eyes={stats['eyes']}"
+                )
+            if args.duration_s is not None and now - started >= args.duration_s:
+                reader.stop()
+
+        try:
+            events = service.process_stream(
+                frames,
+                args.camera_id,
+                str(args.source),
+                commit_interval_s=stream_cfg.get("commit_interval_s", 1.0),
+                on_frame=on_frame,
+            )
+        except KeyboardInterrupt:
+            events = None
+    print(
+        f"Stream stopped after {time.monotonic() - started:.1f}s: processed {stats['frames']} of "
+        f"{reader.frames_captured} captured frames"
+        + ("" if events is None else f", logged {events} event(s).")
+    )
+
+if __name__ == "__main__":
+    main()
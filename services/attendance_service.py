@@ -1,40 +1,153 @@
-import numpy as np
+import time
 from datetime import datetime
 from core.video_reader import VideoReader
 from core.matcher import IrisMatcher
-from db.models import IrisTemplate, AttendanceEvent
+from core.metrics import METRICS
+from services.event_writer import EventDebouncer, EventWriter
+from services.template_gallery import TemplateGallery
+
+DEFAULT_FPS = 25.0
 
 class AttendanceService:
-    def __init__(self, pipeline, db_session, threshold: float = 0.7, frame_skip: int = 5):
+    def __init__(
+        self,
+        pipeline,
+        db_session,
+        threshold: float = 0.7,
+        frame_skip: int = 5,
+        gallery: TemplateGallery = None,
+        debounce_seconds: float = 0.0,
+        insert_batch_size: int = 500,
+        sampler=None,
+    ):
         self.pipeline = pipeline
         self.db = db_session
         self.matcher = IrisMatcher(threshold=threshold)
         self.frame_skip = frame_skip
+        # a MotionSampler replaces the fixed frame_skip for recorded video
+        self.sampler = sampler
+        # a private gallery still works, it just can't be reused across services
+        self.gallery = gallery if gallery is not None else TemplateGallery()
+        self._gallery_version = None
+        self.debounce_seconds = debounce_seconds
+        self.insert_batch_size = insert_batch_size
+        self.last_video = None
+
+    def _sync_gallery(self):
+        self.gallery.refresh(self.db)
+        _, person_ids, embeddings, index, version = self.gallery.snapshot_with_index()
+        if version != self._gallery_version:
+            self.matcher.load_gallery(person_ids, embeddings, normalized=True, index=index)
+            self._gallery_version = version
+
+    def _match(self, emb_data):
+        with METRICS.timer("match"):
+            matches = self.matcher.match_batch([item["embedding"] for item in emb_data])
+        METRICS.inc("matches", sum(1 for person_id, _ in matches if person_id is not None))
+        return matches
+
+    def process_video(self, video_path: str, camera_id: str, progress_callback=None) -> int:
+        """Match every sampled frame and log attendance.
+
+        Hits are debounced per (person, camera) over ``debounce_seconds`` of
+        video time, and surviving events are bulk inserted in batches of
+        ``insert_batch_size``. ``progress_callback(frames_processed,
+        frames_total)`` is called after each sampled frame; frames_total is
+        None when the container doesn't report a frame count. Returns the
+        number of events written.
+        """
+        writer = EventWriter(self.db, batch_size=self.insert_batch_size)
+        for rows in self.iter_video_events(video_path, camera_id, progress_callback):
+            writer.add(rows)
+        writer.flush()
+        self.db.commit()
+        return writer.written
 
-    def _load_templates(self):
-        templates = []
-        for t in self.db.query(IrisTemplate).all():
-            emb = np.frombuffer(t.embedding, dtype=np.float32)
-            templates.append({"person_id": t.person_id, "embedding": emb})
-        return templates
-
-    def process_video(self, video_path: str, camera_id: str):
-        templates = self._load_templates()
-        reader = VideoReader(frame_skip=self.frame_skip)
-
-        for frame_idx, frame in reader.iter_frames(video_path):
-            emb_data = self.pipeline.process_frame(frame)
-            for item in emb_data:
-                person_id, score = self.matcher.match(item["embedding"], templates)
+    def iter_video_events(self, video_path: str, camera_id: str, progress_callback=None):
+        """Yield lists of debounced event rows for a video without writing them.
+
+        Rows are ``attendance_events`` column dicts, as ``process_video``
+        inserts them. Once exhausted, ``last_video`` holds ``{"frames":
+        sampled frames processed, "video_frames": container frame count or
+        None}``.
+        """
+        self._sync_gallery()
+        reader = VideoReader(frame_skip=self.frame_skip, sampler=self.sampler)
+        debouncer = EventDebouncer(self.debounce_seconds)
+
+        frames = reader.iter_frames(video_path)
+        fps = reader.fps or DEFAULT_FPS
+        frames_total = reader.sampled_frame_count
+        n = 0
+        for n, (frame_idx, emb_data) in enumerate(
+            self.pipeline.process_frames(frames, camera_id=camera_id), 1
+        ):
+            if progress_callback is not None:
+                progress_callback(n, frames_total)
+            if not emb_data:
+                continue
+            matches = self._match(emb_data)
+            for (person_id, score), item in zip(matches, emb_data):
                 if person_id is None:
                     continue
-                event = AttendanceEvent(
-                    person_id=person_id,
-                    camera_id=camera_id,
-                    video_path=video_path,
-                    timestamp=datetime.utcnow(),
-                    score=score,
-                    frame_idx=frame_idx,
-                )
-                self.db.add(event)
-        self.db.commit()
+                row = {
+                    "person_id": person_id,
+                    "camera_id": camera_id,
+                    "video_path": video_path,
+                    "timestamp": datetime.utcnow(),
+                    "score": score,
+                    "quality_score": item["quality"],
+                    "frame_idx": frame_idx,
+                }
+                yield debouncer.offer(frame_idx / fps, row)
+        yield debouncer.flush()
+        self.last_video = {"frames": n, "video_frames": reader.frame_count}
+
+    def process_stream(self, frames, camera_id: str, source: str, commit_interval_s: float = 1.0,
+                       on_frame=None) -> int:
+        """Log attendance from a live stream until ``frames`` is exhausted.
+
+        frames: iterable of ``(frame_idx, frame, captured_at)`` where
+        captured_at is a ``time.monotonic()`` timestamp.
+        Events are debounced on capture time and written as soon as their
+        window closes, committing at most every ``commit_interval_s``.
+        The gallery is re-synced on every commit so new enrollments show up
+        without a restart. ``on_frame(frame_idx, n_embeddings)`` is called
+        after each processed frame. Returns the number of events written.
+        """
+        self._sync_gallery()
+        debouncer = EventDebouncer(self.debounce_seconds)
+        writer = EventWriter(self.db, batch_size=self.insert_batch_size)
+        last_commit = time.monotonic()
+        detector = self.pipeline.source_detector(camera_id)
+        try:
+            for frame_idx, frame, captured_at in frames:
+                emb_data = self.pipeline.process_frame(frame, detector)
+                if emb_data:
+                    matches = self._match(emb_data)
+                    for (person_id, score), item in zip(matches, emb_data):
+                        if person_id is None:
+                            continue
+                        row = {
+                            "person_id": person_id,
+                            "camera_id": camera_id,
+                            "video_path": source,
+                            "timestamp": datetime.utcnow(),
+                            "score": score,
+                            "quality_score": item["quality"],
+                            "frame_idx": frame_idx,
+                        }
+                        writer.add(debouncer.offer(captured_at, row))
+                writer.add(debouncer.expire(time.monotonic()))
+                if on_frame is not None:
+                    on_frame(frame_idx, len(emb_data))
+                if time.monotonic() - last_commit >= commit_interval_s:
+                    writer.flush()
+                    self.db.commit()
+                    self._sync_gallery()
+                    last_commit = time.monotonic()
+        finally:
+            writer.add(debouncer.flush())
+            writer.flush()
+            self.db.commit()
+        return writer.written
@@ -1,37 +1,151 @@
 import numpy as np
+from core.matcher import l2_normalize
 from core.video_reader import VideoReader
 from db.models import Person, IrisTemplate
 
+class TemplateSelector:
+    """Keep the best few mutually distinct embeddings seen in a clip.
+
+    Holds at most ``max_templates`` ``(quality, embedding)`` entries. A
+    new sample closer than ``max_similarity`` (cosine) to a kept one
+    competes only for that entry's slot, so near-duplicate frames can't
+    crowd out other poses; otherwise it replaces the lowest-quality entry
+    once the set is full. Memory is bounded by ``max_templates``.
+    """
+
+    def __init__(self, max_templates: int = 2, max_similarity: float = 0.95):
+        self.max_templates = max_templates
+        self.max_similarity = max_similarity
+        self.entries = []
+
+    def offer(self, embedding, quality: float) -> bool:
+        """Consider one sample; True if it was kept."""
+        if self.max_templates <= 0:
+            return False
+        unit = l2_normalize(embedding)[0]
+        if self.entries:
+            sims = np.array([float(unit @ e[2]) for e in self.entries])
+            nearest = int(np.argmax(sims))
+            if sims[nearest] >= self.max_similarity:
+                if quality > self.entries[nearest][0]:
+                    self.entries[nearest] = (quality, embedding, unit)
+                    return True
+                return False
+        if len(self.entries) < self.max_templates:
+            self.entries.append((quality, embedding, unit))
+            return True
+        worst = min(range(len(self.entries)), key=lambda i: self.entries[i][0])
+        if quality > self.entries[worst][0]:
+            self.entries[worst] = (quality, embedding, unit)
+            return True
+        return False
+
+    def templates(self):
+        """Kept ``(quality, embedding)`` pairs, best first."""
+        return [(q, emb) for q, emb, _ in sorted(self.entries, key=lambda e: -e[0])]
+
 class EnrollmentService:
-    def __init__(self, pipeline, db_session, frame_skip: int = 3):
+    """Enroll a person from a short video.
+
+    Frames are streamed: the clip mean embedding and quality are kept as
+    running sums and the best distinct samples in a ``TemplateSelector``,
+    so memory doesn't grow with clip length. The person and up to
+    ``max_templates`` templates (the clip mean, then the selected samples)
+    are written in one transaction, so a failed enrollment leaves no rows
+    behind. Reading stops early once ``stop_after`` samples of at least
+    ``good_quality`` have been seen (None reads the whole clip).
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        db_session,
+        frame_skip: int = 3,
+        gallery=None,
+        max_templates: int = 3,
+        max_similarity: float = 0.95,
+        good_quality: float = 0.5,
+        stop_after: int = None,
+    ):
         self.pipeline = pipeline
         self.db = db_session
         self.frame_skip = frame_skip
+        self.gallery = gallery
+        self.max_templates = max_templates
+        self.max_similarity = max_similarity
+        self.good_quality = good_quality
+        self.stop_after = stop_after
 
-    def enroll_from_video(self, person_meta: dict, video_path: str):
-        person = Person(**person_meta)
-        self.db.add(person)
-        self.db.commit()
+    def enroll_from_video(self, person_meta: dict, video_path: str, progress_callback=None):
+        code = person_meta.get("employee_code")
+        if code is not None and self.db.query(Person.id).filter(Person.employee_code == code).first():
+            raise ValueError(f"Employee code {code!r} is already enrolled")
+        templates = self.extract_templates(video_path, progress_callback)
+        try:
+            person_id = self.add_person(person_meta, templates)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        if self.gallery is not None:
+            self.gallery.refresh(self.db)
+        return person_id
 
+    def extract_templates(self, video_path: str, progress_callback=None):
+        """Stream ``video_path`` and return ``[(embedding, quality), ...]`` to store.
+
+        Needs no database session. Raises RuntimeError if the clip yields
+        no embeddings.
+        """
         reader = VideoReader(frame_skip=self.frame_skip)
-        embeddings = []
+        selector = TemplateSelector(self.max_templates - 1, self.max_similarity)
+        emb_sum = None
+        quality_sum = 0.0
+        samples = 0
+        good = 0
 
-        for _, frame in reader.iter_frames(video_path):
-            emb_data = self.pipeline.process_frame(frame)
-            for item in emb_data:
-                embeddings.append(item["embedding"])
+        frames = reader.iter_frames(video_path)
+        frames_total = reader.sampled_frame_count
+        results = self.pipeline.process_frames(frames)
+        try:
+            for n, (_, emb_data) in enumerate(results, 1):
+                if progress_callback is not None:
+                    progress_callback(n, frames_total)
+                for item in emb_data:
+                    emb = item["embedding"]
+                    emb_sum = emb.astype(np.float64) if emb_sum is None else emb_sum + emb
+                    quality_sum += item["quality"]
+                    samples += 1
+                    good += item["quality"] >= self.good_quality
+                    selector.offer(emb, item["quality"])
+                if self.stop_after is not None and good >= self.stop_after:
+                    break
+        finally:
+            # stops decoding (and staged workers) when we leave early
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
 
-        if len(embeddings) == 0:
+        if samples == 0:
             raise RuntimeError("No iris embeddings extracted from enrollment video")
 
-        avg_emb = np.mean(np.stack(embeddings, axis=0), axis=0)
+        templates = [((emb_sum / samples).astype(np.float32), quality_sum / samples)]
+        templates += [(emb, quality) for quality, emb in selector.templates()]
+        return templates
 
-        template = IrisTemplate(
-            person_id=person.id,
-            embedding=avg_emb.tobytes(),
-            eye_side="unknown",
-            quality_score=1.0,
-        )
-        self.db.add(template)
-        self.db.commit()
+    def add_person(self, person_meta: dict, templates) -> int:
+        """Add a person and their templates to the session (flushed, not committed)."""
+        person = Person(**person_meta)
+        self.db.add(person)
+        self.db.flush()
+        self.db.add_all([
+            IrisTemplate(
+                person_id=person.id,
+                embedding=np.asarray(emb, dtype=np.float32).tobytes(),
+                eye_side="unknown",
+                quality_score=float(quality),
+            )
+            for emb, quality in templates
+        ])
+        self.db.flush()
         return person.id
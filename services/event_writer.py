@@ -0,0 +1,71 @@
+from sqlalchemy import insert
+
+from core.metrics import METRICS
+from db.models import AttendanceEvent
+
+class EventDebouncer:
+    """Collapse repeated hits into one event per window.
+
+    Hits are grouped per ``(person_id, camera_id)``. The first hit opens a
+    window of ``window_s`` seconds (video time); later hits inside it only
+    replace the pending event if they score higher. A window closes when a
+    hit for the same key arrives after it ends, when ``expire`` is called
+    with a later time, or on ``flush``. ``window_s <= 0`` disables
+    debouncing.
+    """
+
+    def __init__(self, window_s: float = 0.0):
+        self.window_s = window_s
+        self._open = {}  # key -> [window_start, row]
+
+    def offer(self, t: float, row: dict):
+        """Add a hit at time ``t``; returns rows whose window just closed."""
+        if self.window_s <= 0:
+            return [row]
+        key = (row["person_id"], row["camera_id"])
+        current = self._open.get(key)
+        if current is None:
+            self._open[key] = [t, row]
+            return []
+        start, best = current
+        if t - start < self.window_s:
+            if row["score"] > best["score"]:
+                current[1] = row
+            return []
+        self._open[key] = [t, row]
+        return [best]
+
+    def expire(self, t: float):
+        """Close and return every window that ended before ``t``."""
+        closed = [key for key, (start, _) in self._open.items() if t - start >= self.window_s]
+        return [self._open.pop(key)[1] for key in closed]
+
+    def flush(self):
+        """Close and return every pending window."""
+        rows = [row for _, row in self._open.values()]
+        self._open.clear()
+        return rows
+
+class EventWriter:
+    """Buffer attendance rows and insert them with batched core inserts."""
+
+    def __init__(self, db_session, batch_size: int = 500):
+        self.db = db_session
+        self.batch_size = max(1, batch_size)
+        self.pending = []
+        self.written = 0
+
+    def add(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert buffered rows (the caller owns the commit)."""
+        while self.pending:
+            chunk = self.pending[:self.batch_size]
+            with METRICS.timer("db_write"):
+                self.db.execute(insert(AttendanceEvent), chunk)
+            self.written += len(chunk)
+            METRICS.inc("events_written", len(chunk))
+            del self.pending[:self.batch_size]
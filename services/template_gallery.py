@@ -0,0 +1,247 @@
+import threading
+
+import numpy as np
+from sqlalchemy import func, select
+
+from core.gallery_snapshot import SnapshotWriter, open_snapshot
+from core.matcher import l2_normalize
+from db.models import DatabaseInfo, IrisTemplate
+
+def template_fingerprint(session):
+    """``(count, max_id, id_sum)`` of ``iris_templates``; changes with any insert or delete.
+
+    Sound only because template ids are never reused (AUTOINCREMENT): a
+    delete followed by an insert always moves ``max_id``.
+    """
+    count, max_id, id_sum = session.query(
+        func.count(IrisTemplate.id), func.max(IrisTemplate.id), func.sum(IrisTemplate.id)
+    ).one()
+    return int(count), int(max_id or 0), int(id_sum or 0)
+
+def database_id(session):
+    """The random id ``init_db`` stored for this database, or None."""
+    return session.query(DatabaseInfo.value).filter(DatabaseInfo.key == "database_id").scalar()
+
+def export_snapshot(session, directory, model_version: str, chunk_size: int = 5000):
+    """Write every template to a memory-mappable snapshot in ``directory``.
+
+    Rows are streamed in ``chunk_size`` batches (no ORM objects) ordered by
+    person, and the manifest records ``model_version``, the database id and
+    the table fingerprint used for staleness checks. Returns the manifest.
+    """
+    count, max_id, id_sum = template_fingerprint(session)
+    rows = session.execute(
+        select(IrisTemplate.id, IrisTemplate.person_id, IrisTemplate.embedding).order_by(
+            IrisTemplate.person_id, IrisTemplate.id
+        ).execution_options(yield_per=chunk_size)
+    )
+    writer = None
+    for chunk in rows.partitions(chunk_size):
+        embs = l2_normalize(
+            np.frombuffer(b"".join(r[2] for r in chunk), dtype=np.float32).reshape(len(chunk), -1)
+        )
+        if writer is None:
+            writer = SnapshotWriter(directory, count, embs.shape[1])
+        writer.write([r[0] for r in chunk], [r[1] for r in chunk], embs)
+    if writer is None:
+        writer = SnapshotWriter(directory, 0, 0)
+    return writer.commit(
+        model_version=model_version,
+        database_id=database_id(session),
+        max_template_id=max_id,
+        template_id_sum=id_sum,
+    )
+
+def snapshot_status(manifest, session, model_version: str, embedding_dim: int = None):
+    """Why a snapshot can't be used as is: None if current, else a reason string.
+
+    ``"behind"`` means rows were only added since the export: the
+    templates up to the snapshot's highest id are exactly the ones it
+    holds, so it can seed a gallery and ``refresh`` pulls the rest. Any
+    other reason (``"missing"``, ``"model_version"``, ``"embedding_dim"``,
+    ``"database"`` for a snapshot of another database, ``"diverged"`` when
+    exported rows were deleted) means loading from the database instead.
+    """
+    if manifest is None:
+        return "missing"
+    if manifest.get("model_version") != model_version:
+        return "model_version"
+    if embedding_dim is not None and manifest["count"] and manifest["embedding_dim"] != embedding_dim:
+        return "embedding_dim"
+    current = database_id(session)
+    if current is None or manifest.get("database_id") != current:
+        return "database"
+    fingerprint = (manifest["count"], manifest["max_template_id"], manifest["template_id_sum"])
+    if fingerprint == template_fingerprint(session):
+        return None
+    count, id_sum = session.query(func.count(IrisTemplate.id), func.sum(IrisTemplate.id)).filter(
+        IrisTemplate.id <= manifest["max_template_id"]
+    ).one()
+    if (int(count), int(id_sum or 0)) != (manifest["count"], manifest["template_id_sum"]):
+        return "diverged"
+    return "behind"
+
+class TemplateGallery:
+    """In-memory copy of ``iris_templates`` that refreshes incrementally.
+
+    The gallery loads once and afterwards only pulls rows with an id above
+    the highest one it has seen, plus drops rows that disappeared from the
+    table. Each change bumps ``version`` so matchers know when to reload.
+    This relies on template ids never being reused, which is why
+    ``iris_templates`` is declared AUTOINCREMENT.
+    Arrays are replaced, never mutated, so readers can keep using a
+    snapshot while another thread refreshes.
+
+    With an ``IVFIndex`` configured, an approximate-search index over the
+    rows is kept in step: appended rows are added to it incrementally,
+    deletions and snapshot loads rebuild it. Galleries smaller than the
+    index's ``min_gallery`` have no index and are searched exactly.
+    """
+
+    def __init__(self, index=None):
+        self._lock = threading.Lock()
+        self._index_config = index
+        self._state = (
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty((0, 0), dtype=np.float32),
+            None,
+            0,
+        )
+        self.max_id = 0
+
+    @property
+    def version(self):
+        return self._state[4]
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def load_snapshot(self, directory, session, model_version: str, embedding_dim: int = None) -> bool:
+        """Seed the gallery from an on-disk snapshot (see ``export_snapshot``).
+
+        The snapshot is memory-mapped read-only, so processes on one host
+        share its pages instead of each hydrating templates through the
+        ORM. A snapshot that is current, or only lacks templates added
+        since the export, is used and topped up by the next ``refresh``;
+        any other ``snapshot_status`` (another model, embedding size or
+        database, deleted rows) leaves the gallery to load from the
+        database. Returns True if the snapshot was used.
+
+        Pages stay shared only until the gallery changes: the first
+        ``refresh`` that adds or removes templates builds new arrays, which
+        copies the whole mapped embedding matrix into this process's memory.
+        """
+        if not directory:
+            return False
+        opened = open_snapshot(directory)
+        if opened is None:
+            return False
+        manifest, template_ids, person_ids, embeddings = opened
+        if snapshot_status(manifest, session, model_version, embedding_dim) not in (None, "behind"):
+            return False
+        with self._lock:
+            if len(embeddings) == 0:
+                embeddings = np.empty((0, 0), dtype=np.float32)
+            self._state = (
+                template_ids, person_ids, embeddings, self._build_index(embeddings), self.version + 1
+            )
+            self.max_id = manifest["max_template_id"]
+        return True
+
+    def snapshot(self):
+        """Return ``(template_ids, person_ids, embeddings, version)``.
+
+        Embeddings are L2-normalized float32 rows.
+        """
+        template_ids, person_ids, embeddings, _, version = self._state
+        return template_ids, person_ids, embeddings, version
+
+    def snapshot_with_index(self):
+        """Return ``(template_ids, person_ids, embeddings, index, version)``.
+
+        ``index`` is None when no index is configured or the gallery is
+        too small for one.
+        """
+        return self._state
+
+    def _build_index(self, embeddings):
+        if self._index_config is None:
+            return None
+        # later builds start from the last trained centroids
+        index = self._state[3]
+        return (self._index_config if index is None else index).build(embeddings)
+
+    def refresh(self, session) -> bool:
+        """Sync with the database; returns True if the gallery changed."""
+        with self._lock:
+            template_ids, person_ids, embeddings, index, version = self._state
+            count, max_id = session.query(
+                func.count(IrisTemplate.id), func.max(IrisTemplate.id)
+            ).one()
+            max_id = max_id or 0
+
+            new_rows = []
+            if max_id > self.max_id:
+                new_rows = (
+                    session.query(IrisTemplate.id, IrisTemplate.person_id, IrisTemplate.embedding)
+                    .filter(IrisTemplate.id > self.max_id)
+                    .order_by(IrisTemplate.id)
+                    .all()
+                )
+
+            keep = None
+            if count != len(template_ids) + len(new_rows):
+                # some known rows were deleted; fetch ids only, not blobs
+                live = np.fromiter(
+                    (row[0] for row in session.query(IrisTemplate.id).filter(
+                        IrisTemplate.id <= self.max_id
+                    )),
+                    dtype=np.int64,
+                )
+                keep = np.isin(template_ids, live)
+
+            if not new_rows and keep is None:
+                return False
+
+            appended_from = len(template_ids)
+            if keep is not None:
+                template_ids = template_ids[keep]
+                person_ids = person_ids[keep]
+                embeddings = embeddings[keep]
+            if new_rows:
+                new_embs = l2_normalize(
+                    np.frombuffer(b"".join(r[2] for r in new_rows), dtype=np.float32).reshape(
+                        len(new_rows), -1
+                    )
+                )
+                new_ids = np.array([r[0] for r in new_rows], dtype=np.int64)
+                new_persons = np.array([r[1] for r in new_rows], dtype=np.int64)
+                template_ids = np.concatenate([template_ids, new_ids])
+                person_ids = np.concatenate([person_ids, new_persons])
+                embeddings = new_embs if len(embeddings) == 0 else np.concatenate(
+                    [embeddings, new_embs]
+                )
+
+            if index is not None and keep is None:
+                index = index.add(embeddings, appended_from)
+            else:
+                index = self._build_index(embeddings)
+            self._state = (template_ids, person_ids, embeddings, index, version + 1)
+            self.max_id = max(self.max_id, max_id)
+            return True
+
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+def get_shared_gallery(db_url: str, index=None) -> TemplateGallery:
+    """Process-wide gallery for ``db_url``, created on first use.
+
+    ``index`` (an unbuilt ``IVFIndex``) only applies when the gallery is created.
+    """
+    with _SHARED_LOCK:
+        gallery = _SHARED.get(db_url)
+        if gallery is None:
+            gallery = TemplateGallery(index=index)
+            _SHARED[db_url] = gallery
+        return gallery
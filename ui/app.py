@@ -1,17 +1,21 @@
 import os
 import tempfile
-from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 
 import streamlit as st
+from sqlalchemy import func
 
 from config.config_loader import load_config
+from core.ann_index import IVFIndex
+from core.motion_sampler import MotionSampler
 from core.pipeline import IrisPipeline
-from db.db_utils import get_session, init_db
+from db import queries
+from db.db_utils import init_db, session_scope
 from db.models import AttendanceEvent, IrisTemplate, Person
 from services.attendance_service import AttendanceService
 from services.enrollment_service import EnrollmentService
+from services.template_gallery import get_shared_gallery
 
 st.set_page_config(page_title="Iris Attendance UI", layout="wide")
 st.title("Iris Attendance Control Panel")
@@ -19,10 +23,17 @@ st.title("Iris Attendance Control Panel")
 
 def bootstrap():
     cfg = load_config()
-    init_db(cfg["db_url"])
-    SessionLocal = get_session(cfg)
+    init_db(cfg["db_url"], cfg.get("db"))
     pipeline = IrisPipeline(cfg)
-    return cfg, SessionLocal, pipeline
+    gallery = get_shared_gallery(cfg["db_url"], index=IVFIndex.from_config(cfg.get("match", {}).get("ann")))
+    with session_scope(cfg) as session:
+        gallery.load_snapshot(
+            cfg.get("gallery", {}).get("snapshot_dir"),
+            session,
+            cfg.get("encoder", {}).get("model_version"),
+            pipeline.encoder.embedding_dim,
+        )
+    return cfg, pipeline, gallery
 
 
 @st.cache_resource(show_spinner=False)
@@ -31,13 +42,16 @@ def get_dependencies():
 
 
 try:
-    CFG, SessionFactory, PIPELINE = get_dependencies()
+    CFG, PIPELINE, GALLERY = get_dependencies()
 except Exception as exc:  # pragma: no cover - surfaced in UI
     st.error(f"Failed to bootstrap the pipeline: {exc}")
     st.stop()
 
 VIDEO_CFG = CFG.get("video", {})
+SAMPLER = MotionSampler.from_config(VIDEO_CFG.get("motion"))
 MATCH_CFG = CFG.get("match", {})
+ENROLL_CFG = CFG.get("enrollment", {})
+ATTENDANCE_CFG = CFG.get("attendance", {})
 
 
 def save_uploaded_video(upload, prefix: str) -> str:
@@ -47,13 +61,8 @@ def save_uploaded_video(upload, prefix: str) -> str:
         return tmp.name
 
 
-@contextmanager
 def db_session_scope():
-    session = SessionFactory()
-    try:
-        yield session
-    finally:
-        session.close()
+    return session_scope(CFG)
 
 
 def render_enrollment_page():
@@ -83,6 +92,11 @@ def render_enrollment_page():
                     PIPELINE,
                     session,
                     frame_skip=VIDEO_CFG.get("frame_skip", 3),
+                    gallery=GALLERY,
+                    max_templates=ENROLL_CFG.get("max_templates", 3),
+                    max_similarity=ENROLL_CFG.get("max_similarity", 0.95),
+                    good_quality=ENROLL_CFG.get("good_quality", 0.5),
+                    stop_after=ENROLL_CFG.get("stop_after"),
                 )
                 person_id = service.enroll_from_video(
                     {
@@ -121,16 +135,17 @@ def render_attendance_page():
         try:
             tmp_path = save_uploaded_video(video_file, "attendance")
             with db_session_scope() as session:
-                before_count = session.query(AttendanceEvent).count()
                 service = AttendanceService(
                     PIPELINE,
                     session,
                     threshold=MATCH_CFG.get("threshold", 0.7),
                     frame_skip=VIDEO_CFG.get("frame_skip", 5),
+                    gallery=GALLERY,
+                    debounce_seconds=ATTENDANCE_CFG.get("debounce_seconds", 0.0),
+                    insert_batch_size=ATTENDANCE_CFG.get("insert_batch_size", 500),
+                    sampler=SAMPLER,
                 )
-                service.process_video(tmp_path, camera_id.strip())
-                after_count = session.query(AttendanceEvent).count()
-            new_events = max(after_count - before_count, 0)
+                new_events = service.process_video(tmp_path, camera_id.strip())
             st.success(f"Attendance processing complete. Logged {new_events} new event(s).")
         except Exception as exc:  # pragma: no cover - surfaced in UI
             st.error(f"Attendance processing failed: {exc}")
@@ -139,12 +154,35 @@ def render_attendance_page():
                 os.remove(tmp_path)
 
 
+def _page_cursor(key: str, filters) -> Optional[str]:
+    """Cursor for the page of ``key`` being shown; back to page 1 when ``filters`` change."""
+    state = st.session_state.setdefault(key, {"filters": filters, "cursors": [None]})
+    if state["filters"] != filters:
+        state.update(filters=filters, cursors=[None])
+    return state["cursors"][-1]
+
+
+def _pager(key: str, next_cursor: Optional[str]):
+    cursors = st.session_state[key]["cursors"]
+    if next_cursor is None and len(cursors) == 1:
+        return
+    col1, col2, col3 = st.columns([1, 1, 4])
+    col1.button("Previous page", key=f"{key}_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
+    col2.button(
+        "Next page", key=f"{key}_next", disabled=next_cursor is None,
+        on_click=cursors.append, args=(next_cursor,),
+    )
+    more = "more on the next page" if next_cursor else "last page"
+    col3.caption(f"Page {len(cursors)} ({more})")
+
+
 def render_database_page():
     st.subheader("Database Overview")
     with db_session_scope() as session:
-        total_people = session.query(Person).count()
-        total_templates = session.query(IrisTemplate).count()
-        total_events = session.query(AttendanceEvent).count()
+        # plain count(*) instead of Query.count()'s SELECT-from-subquery wrapper
+        total_people = session.query(func.count()).select_from(Person).scalar()
+        total_templates = session.query(func.count()).select_from(IrisTemplate).scalar()
+        total_events = session.query(func.count()).select_from(AttendanceEvent).scalar()
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Enrolled Persons", total_people)
@@ -152,11 +190,19 @@ def render_database_page():
         col3.metric("Attendance Events", total_events)
 
         st.markdown("### Recent Attendance Events")
-        events = (
-            session.query(AttendanceEvent)
-            .order_by(AttendanceEvent.timestamp.desc())
-            .limit(25)
-            .all()
+        col1, col2, col3 = st.columns(3)
+        camera_filter = col1.text_input("Camera filter", value="")
+        department_filter = col2.text_input("Department filter", value="")
+        page_size = int(col3.number_input("Rows", min_value=10, max_value=200, value=25, step=5))
+
+        camera = camera_filter.strip() or None
+        department = department_filter.strip() or None
+        events, next_events = queries.list_events(
+            session,
+            limit=page_size,
+            cursor=_page_cursor("events_page", (camera, department, page_size)),
+            camera_id=camera,
+            department=department,
         )
         if events:
             event_rows = [
@@ -165,6 +211,7 @@ def render_database_page():
                     "Person ID": e.person_id,
                     "Camera": e.camera_id,
                     "Score": round(float(e.score), 3),
+                    "Quality": None if e.quality_score is None else round(float(e.quality_score), 2),
                     "Frame": e.frame_idx,
                     "Timestamp (UTC)": e.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
                 }
@@ -173,9 +220,15 @@ def render_database_page():
             st.dataframe(event_rows, use_container_width=True)
         else:
             st.info("No attendance events recorded yet.")
+        _pager("events_page", next_events)
 
         st.markdown("### Enrolled Persons")
-        people = session.query(Person).order_by(Person.created_at.desc()).all()
+        people, next_people = queries.list_persons(
+            session,
+            limit=page_size,
+            cursor=_page_cursor("persons_page", (department, page_size)),
+            department=department,
+        )
         if people:
             person_rows = [
                 {
@@ -184,13 +237,14 @@ def render_database_page():
                     "Employee Code": p.employee_code,
                     "Department": p.department or "",
                     "Created": p.created_at.strftime("%Y-%m-%d %H:%M"),
-                    "Templates": len(p.iris_templates),
+                    "Templates": p.templates,
                 }
                 for p in people
             ]
             st.dataframe(person_rows, use_container_width=True)
         else:
             st.info("No enrolled persons yet.")
+        _pager("persons_page", next_people)
 
 
 PAGES = {